@@ -0,0 +1,410 @@
+"""
+Benchmarks of the per-frame hot paths of the game, run headless on the dummy drivers of SDL.
+
+Results are written as JSON and compared against a stored baseline:
+
+    python benchmarks/run_benchmarks.py --save-baseline      # store the reference numbers
+    python benchmarks/run_benchmarks.py                      # compare against them
+
+A recorded replay can be benchmarked instead, timing every tick of the exact same game:
+
+    python benchmarks/run_benchmarks.py --replay game.ssr --baseline replay_baseline.json --save-baseline
+"""
+
+import json
+import platform
+import sys
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+from random import randint, seed
+from statistics import mean, median
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pygame  # noqa: E402
+
+from game import Game  # noqa: E402
+from modules.decals import decal_layer  # noqa: E402
+from modules.pursuit import PursuitField  # noqa: E402
+from modules.player import player_blood_effects, shoe_print_pool  # noqa: E402
+from modules.replay import Replay, ReplayControls  # noqa: E402
+from modules.simulation import ScriptedControls  # noqa: E402
+from modules.spiders import (  # noqa: E402
+    AdultSpider, SpiderBloodSplash, SpiderBloodSplat, adult_spider_pool, spider_blood_effects, spider_sprites,
+    splash_pool, splat_pool
+)
+from modules.toolkit import (  # noqa: E402
+    Direction, GameState, asset_registry, detect_collision, get_pool_statistics, release, reset_pool_statistics
+)
+from modules.weapons import Bullet, bullet_pool, bullet_sprites  # noqa: E402
+
+
+BENCHMARKS_DIR: Path = Path(__file__).resolve().parent
+DEFAULT_BASELINE: Path = BENCHMARKS_DIR / "baseline.json"
+DEFAULT_OUTPUT: Path = BENCHMARKS_DIR / "results.json"
+
+SPIDER_COUNTS: tuple = (10, 100, 500)
+BULLET_COUNTS: tuple = (10, 100)
+DECAL_COUNTS: tuple = (100, 500)
+
+
+def idle_script(tick: int, controls: ScriptedControls) -> None:
+    """Keeps the mouse still in the middle of the arena, without shooting."""
+
+    controls.mouse_position = (450, 225)
+    controls.mouse_buttons = (False, False, False)
+    controls.pressed_keys = set()
+
+
+def populate(spiders: int = 0, bullets: int = 0, decals: int = 0) -> None:
+    """Tops up the sprite groups to the requested number of entities.
+
+    Args:
+        spiders (int, optional): The number of spiders.
+        bullets (int, optional): The number of bullets.
+        decals (int, optional): The number of blood splats and footprints, each, baked into the floor.
+    """
+
+    # Entities are taken from their pools, as the game does, so that the pool statistics stay meaningful.
+    while len(spider_sprites) < spiders:
+        spider = adult_spider_pool.acquire()
+        spider.rect.center = (randint(0, 900), randint(0, 450))
+        spider_sprites.add(spider)
+
+    while len(bullet_sprites) < bullets:
+        bullet_sprites.add(
+            bullet_pool.acquire(
+                player_position=(randint(0, 900), randint(0, 450)),
+                player_direction=Direction.EAST,
+                target_position=(450, 225)
+            )
+        )
+
+    while len(decal_layer) < decals * 2:
+        decal_layer.add(splat_pool.acquire(position=(randint(0, 900), randint(0, 450))))
+        decal_layer.add(shoe_print_pool.acquire((randint(0, 900), randint(0, 450)), Direction.NORTH))
+
+
+def reset() -> None:
+
+    # The remaining entities go back to their pools, without the side effects of killing them.
+    for group in (spider_sprites, bullet_sprites, spider_blood_effects, player_blood_effects):
+
+        for sprite in group.sprites():
+
+            release(sprite)
+
+        group.empty()
+
+    decal_layer.reset(ground=decal_layer.ground)
+
+
+def measure(function: Callable, prepare: Callable = lambda: None, repeat: int = 100) -> dict:
+    """Times a function, preparing the scene before every call outside of the measured time.
+
+    Args:
+        function (Callable): The function to time.
+        prepare (Callable, optional): A function called before every measured call.
+        repeat (int, optional): The number of measured calls.
+
+    Returns:
+        dict: The median, mean, minimum and maximum durations in milliseconds.
+    """
+
+    durations: list[float] = []
+
+    for _ in range(repeat):
+
+        prepare()
+        start: float = time.perf_counter()
+        function()
+        durations.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "median_ms": median(durations),
+        "mean_ms": mean(durations),
+        "min_ms": min(durations),
+        "max_ms": max(durations)
+    }
+
+
+def run_case(
+        results: dict,
+        name: str,
+        function: Callable,
+        prepare: Callable = lambda: None,
+        repeat: int = 100
+) -> None:
+    """Measures a benchmark, along with the activity of the object pools during its calls only.
+
+    Args:
+        results (dict): The results, where the result of the benchmark is stored under its name.
+        name (str): The name of the benchmark.
+        function (Callable): The function to time.
+        prepare (Callable, optional): A function called before every measured call.
+        repeat (int, optional): The number of measured calls.
+    """
+
+    reset_pool_statistics()
+    results[name] = measure(function, prepare=prepare, repeat=repeat)
+    results[name]["pools"] = {
+        pool: statistics for pool, statistics in get_pool_statistics().items()
+        if statistics["created"] or statistics["reused"] or statistics["released"] or statistics["discarded"]
+    }
+
+
+def run_benchmarks(repeat: int) -> dict:
+
+    seed(0)
+    game = Game(headless=True, controls=ScriptedControls(script=idle_script))
+    game.state = GameState.ACTIVE
+    light_map = game.light_map
+    pursuit_field = PursuitField()
+    results: dict = {}
+
+    def keep_player_alive() -> None:
+
+        game.player.hearts = 5
+        game.state = GameState.ACTIVE
+
+    # Warm up the caches and the JIT compiled functions, which would otherwise weigh on the first results.
+    populate(spiders=10, bullets=10, decals=10)
+    measure(game.do_game, prepare=keep_player_alive, repeat=10)
+    reset()
+
+    for spiders in SPIDER_COUNTS:
+
+        for bullets in BULLET_COUNTS:
+
+            name: str = f"do_game[spiders={spiders},bullets={bullets}]"
+            run_case(
+                results,
+                name,
+                game.do_game,
+                prepare=lambda: (keep_player_alive(), populate(spiders=spiders, bullets=bullets)),
+                repeat=repeat
+            )
+            reset()
+
+            name = f"detect_collision[spiders={spiders},bullets={bullets}]"
+            run_case(
+                results,
+                name,
+                lambda: detect_collision(bullet_sprites, spider_sprites, True, True),
+                prepare=lambda: populate(spiders=spiders, bullets=bullets),
+                repeat=repeat
+            )
+            reset()
+
+        name = f"spider_sprites.update[spiders={spiders}]"
+        run_case(
+            results,
+            name,
+            lambda: spider_sprites.update(game.player.rect.center),
+            prepare=lambda: populate(spiders=spiders),
+            repeat=repeat
+        )
+        reset()
+
+        name = f"spider_sprites.update[spiders={spiders},pursuit_field]"
+        run_case(
+            results,
+            name,
+            lambda: (
+                pursuit_field.update(game.player.rect.center),
+                spider_sprites.update(game.player.rect.center, pursuit_field)
+            ),
+            prepare=lambda: populate(spiders=spiders),
+            repeat=repeat
+        )
+        reset()
+
+    for bullets in BULLET_COUNTS:
+
+        name = f"bullet_sprites.update[bullets={bullets}]"
+        run_case(
+            results,
+            name,
+            lambda: (
+                bullet_sprites.update(),
+                [bullet.render_light_effect(light_map) for bullet in bullet_sprites],
+                light_map.render(game.display_surface)
+            ),
+            prepare=lambda: populate(bullets=bullets),
+            repeat=repeat
+        )
+        reset()
+
+    for decals in DECAL_COUNTS:
+
+        name = f"do_game[decals={decals}]"
+        run_case(
+            results,
+            name,
+            game.do_game,
+            prepare=lambda: (keep_player_alive(), populate(decals=decals)),
+            repeat=repeat
+        )
+        reset()
+
+    run_case(
+        results,
+        "Hud.update",
+        lambda: (game.hud.update(game.player.hearts, game.player.stamina), game.hud.draw()),
+        repeat=repeat
+    )
+
+    position: tuple[int, int] = (450, 225)
+    # Constructing instances directly, which the pools don't see, as a reference for the pool benchmarks below.
+    run_case(results, "AdultSpider()", AdultSpider, repeat=repeat)
+    run_case(results, "SpiderBloodSplash()", lambda: SpiderBloodSplash(position=position), repeat=repeat)
+    run_case(results, "SpiderBloodSplat()", lambda: SpiderBloodSplat(position=position), repeat=repeat)
+    run_case(
+        results,
+        "Bullet()",
+        lambda: Bullet(player_position=position, player_direction=Direction.EAST, target_position=(450, 225)),
+        repeat=repeat
+    )
+
+    # Recycling an instance through its pool, acquiring it then releasing it right away.
+    for name, pool, arguments in (
+        ("adult_spider_pool", adult_spider_pool, {}),
+        ("splash_pool", splash_pool, {"position": position}),
+        ("splat_pool", splat_pool, {"position": position}),
+        ("shoe_print_pool", shoe_print_pool, {"position": position, "player_direction": Direction.NORTH}),
+        (
+            "bullet_pool", bullet_pool,
+            {"player_position": position, "player_direction": Direction.EAST, "target_position": (450, 225)}
+        )
+    ):
+        run_case(
+            results,
+            f"{name}.acquire()",
+            lambda: pool.release(pool.acquire(**arguments)),
+            repeat=repeat
+        )
+
+    return {
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "shadow_cache": asset_registry.shadow_statistics,
+        "results": results
+    }
+
+
+def run_replay_benchmark(file: Path) -> dict:
+    """Plays a replay back headless, timing every tick along with the frame rendered after it.
+
+    Args:
+        file (Path): The replay file.
+
+    Returns:
+        dict: The report, with the durations of the ticks.
+    """
+
+    replay: Replay = Replay.load(file)
+    game = Game(
+        headless=True,
+        controls=ReplayControls(replay=replay),
+        seed=replay.seed,
+        use_swarm=replay.use_swarm,
+        use_pursuit_field=replay.use_pursuit_field,
+        separation=replay.separation
+    )
+    ticks: int = 0
+
+    def step() -> None:
+
+        nonlocal ticks
+        ticks += 1
+        game.step()
+        game.render()
+
+    result: dict = measure(step, repeat=len(replay))
+    result["ticks"] = ticks
+
+    return {
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "repeat": 1,
+        "pools": get_pool_statistics(),
+        "shadow_cache": asset_registry.shadow_statistics,
+        "results": {f"replay[{file.name}]": result}
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> list[str]:
+    """Compares the median durations of a report with those of a baseline.
+
+    Args:
+        report (dict): The current results.
+        baseline (dict): The reference results.
+        threshold (float): The ratio above which a benchmark is considered as a regression.
+
+    Returns:
+        list[str]: The names of the benchmarks that regressed.
+    """
+
+    regressions: list[str] = []
+
+    for name, result in report["results"].items():
+
+        reference: dict | None = baseline["results"].get(name)
+
+        if reference is None:
+            print(f"{name:<50} {result['median_ms']:>10.3f} ms  (new)")
+            continue
+
+        ratio: float = result["median_ms"] / max(reference["median_ms"], 1e-9)
+        flag: str = "REGRESSION" if ratio > threshold else ""
+        print(f"{name:<50} {result['median_ms']:>10.3f} ms  x{ratio:.2f} {flag}")
+
+        if ratio > threshold:
+            regressions.append(name)
+
+    return regressions
+
+
+def main() -> int:
+
+    parser = ArgumentParser(description="Benchmarks of the per-frame hot paths of Spider Smash.")
+    parser.add_argument("--repeat", type=int, default=100, help="number of measured calls per benchmark")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="where to write the JSON results")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="the JSON baseline to compare to")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=1.2, help="slowdown ratio reported as a regression")
+    parser.add_argument("--replay", type=Path, help="benchmark the ticks of a replay instead")
+    arguments = parser.parse_args()
+
+    if arguments.replay:
+        report: dict = run_replay_benchmark(arguments.replay)
+    else:
+        report = run_benchmarks(repeat=arguments.repeat)
+    arguments.output.write_text(json.dumps(report, indent=4))
+
+    if arguments.save_baseline:
+        arguments.baseline.write_text(json.dumps(report, indent=4))
+        print(f"Baseline saved to {arguments.baseline}")
+        return 0
+
+    if not arguments.baseline.exists():
+
+        for name, result in report["results"].items():
+
+            print(f"{name:<50} {result['median_ms']:>10.3f} ms")
+
+        print(f"No baseline found at {arguments.baseline}, run with --save-baseline to create one.")
+        return 0
+
+    regressions: list[str] = compare(report, json.loads(arguments.baseline.read_text()), arguments.threshold)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+
+    sys.exit(main())
@@ -2,27 +2,97 @@
 This module serves as the core module of the game, containing essential elements such as the Game class.
 """
 
-import sys
-import pygame
-from pathlib import Path
-
-from modules import constants
-from modules.menu import GameMenu
-from modules.hud import Hud
-from modules.player import Player, player_sprite, player_blood_effects
-from modules.spiders import AdultSpider, spider_sprites, spider_blood_effects
-from modules.weapons import Bullet, bullet_sprites
-from modules.toolkit import GameState, load_images, detect_collision
+from time import perf_counter
+
+# Taken before importing anything else, for the startup report.
+startup_start: float = perf_counter()
+
+import logging  # noqa: E402
+import os  # noqa: E402
+import sys  # noqa: E402
+import threading  # noqa: E402
+import numpy as np  # noqa: E402
+import pygame  # noqa: E402
+from argparse import ArgumentParser  # noqa: E402
+from pathlib import Path  # noqa: E402
+from typing import Callable  # noqa: E402
+
+from modules import constants  # noqa: E402
+from modules.atlas import sprite_atlas  # noqa: E402
+from modules.menu import GameMenu  # noqa: E402
+from modules.hud import Hud  # noqa: E402
+from modules.decals import decal_layer  # noqa: E402
+from modules.profiler import FrameProfiler, StartupTimer  # noqa: E402
+from modules.pursuit import PursuitField  # noqa: E402
+from modules.quality import quality_governor  # noqa: E402
+from modules.player import Player, player_sprite, player_blood_effects  # noqa: E402
+from modules.spawner import spawn_scheduler  # noqa: E402
+from modules.spiders import (  # noqa: E402
+    adult_spider_pool, baby_spider_pool, bake_rotated_frames, spider_hash, spider_sprites, spider_blood_effects
+)
+from modules.replay import Replay, ReplayControls, ReplayRecorder  # noqa: E402
+from modules.simulation import (  # noqa: E402
+    MAX_CATCH_UP_TICKS, TICK_DURATION, TICKS_PER_SECOND, Controls, InputState, ScriptedControls, simulation
+)
+from modules.swarm import SpiderSwarm  # noqa: E402
+from modules.weapons import Bullet, bullet_pool, bullet_sprites, get_bullet_image  # noqa: E402
+from modules.toolkit import (  # noqa: E402
+    GameState, AssetLoader, DirtyRectRenderer, LightMap, asset_registry, detect_collision, kernels, screen_shake
+)
 
 
 class Game:
 
-    def __init__(self):
+    def __init__(
+            self,
+            use_swarm: bool = False,
+            headless: bool = False,
+            controls: Controls | None = None,
+            dirty_rects: bool = False,
+            startup_report: bool = False,
+            use_atlas: bool = True,
+            seed: int | None = None,
+            record: Path | None = None,
+            interpolate: bool = False,
+            max_fps: int | None = None,
+            use_pursuit_field: bool = False,
+            separation: bool = False
+    ):
+
+        # The startup report is printed once the game is fully loaded.
+        self.startup_timer = StartupTimer(start=startup_start)
+        self.startup_timer.mark("imports")
+        self.startup_report: bool = startup_report
 
         ##############################
         # Basic required code.
         ##############################
 
+        # A headless game runs on the dummy drivers of SDL, with scripted input.
+        self.headless: bool = headless
+
+        if self.headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            os.environ["SDL_AUDIODRIVER"] = "dummy"
+            controls = controls or ScriptedControls()
+
+        simulation.reseed(seed)
+        self.record_file: Path | None = record
+        self.replay: Replay | None = None
+
+        if self.record_file is not None:
+            self.replay = Replay(
+                seed=simulation.seed,
+                use_swarm=use_swarm,
+                use_pursuit_field=use_pursuit_field,
+                separation=separation
+            )
+            controls = ReplayRecorder(controls=controls or Controls(), replay=self.replay)
+
+        # The game is simulated at a fixed rate whatever the frame rate, time being derived from the tick counter,
+        # so that it plays at the same speed on every machine and a replay plays back exactly the same.
+        simulation.set_fixed_step(controls=controls or Controls())
+
         pygame.init()
         pygame.mixer.init()
 
@@ -31,102 +101,298 @@ class Game:
 
         pygame.display.set_caption("Spider Smash")
 
+        # Frames are rendered at the refresh rate of the display, drawing the sprites between their positions
+        # of the two last ticks if interpolation is enabled. The refresh rate is unknown to pygame before pygame-ce,
+        # and 0 when the driver doesn't report it.
+        get_refresh_rate: Callable[[], int] = getattr(pygame.display, "get_current_refresh_rate", lambda: 0)
+        refresh_rate: int = get_refresh_rate() or TICKS_PER_SECOND
+        self.max_fps: int = refresh_rate if max_fps is None else max_fps
+        self.interpolate: bool = interpolate
+        self.previous_positions: dict[pygame.sprite.Sprite, tuple[int, int]] = {}
+        self.startup_timer.mark("display")
+
+        # When a sprite atlas was baked with tools/pack_atlas.py, the frames it holds are mapped instead of loaded.
+        if use_atlas and sprite_atlas.load():
+            asset_registry.load_atlas(sprite_atlas)
+            self.startup_timer.mark("atlas")
+
         ##############################
         # Useful variables.
         ##############################
 
-        self.assets: dict = load_images(folder=Path(constants.GRAPHICS_DIR / "general"))
-        self.game_music = pygame.mixer.Sound(Path(constants.AUDIO_DIR / "general" / "game_music.ogg"))
-        self.game_music.set_volume(0.2)
+        self.do_game_menu_music: bool = True
         self.do_game_music: bool = True
-        self.game_over_music = pygame.mixer.Sound(Path(constants.AUDIO_DIR / "general" / "game_over.wav"))
         self.do_game_over_music: bool = True
-        self.game_menu_music = pygame.mixer.Sound(Path(constants.AUDIO_DIR / "menu" / "game_menu.ogg"))
-        self.game_menu_music.set_volume(0.2)
-        self.do_game_menu_music: bool = True
-        self.start_sound = pygame.mixer.Sound(Path(constants.AUDIO_DIR / "menu" / "start.wav"))
-        self.start_sound.set_volume(0.35)
         self.state = GameState.MENU
-        self.game_state_action: dict = {
-            GameState.ACTIVE: self.do_game,
-            GameState.MENU: self.do_menu,
-            GameState.OVER: self.do_game_over
+        self.game_state_update: dict = {
+            GameState.ACTIVE: self.update_game,
+            GameState.MENU: self.update_menu,
+            GameState.OVER: self.update_game_over
+        }
+        self.game_state_render: dict = {
+            GameState.ACTIVE: self.render_game,
+            GameState.MENU: self.render_menu,
+            GameState.OVER: self.render_game_over
         }
 
         ##############################
         # Game elements.
         ##############################
 
-        self.player = Player()
+        # Only the menu is built right away, the gameplay elements are loaded in stages while it is displayed.
         self.menu = GameMenu()
-        self.hud = Hud()
+        self.profiler = FrameProfiler()
 
-        player_sprite.add(self.player)
+        # With dirty rectangles, only the areas of the screen that changed are redrawn and updated.
+        self.renderer = DirtyRectRenderer(size=(900, 450))
+        self.renderer.enabled = dirty_rects
+
+        self.use_swarm: bool = use_swarm
+        self.assets: dict = {}
+        self.game_menu_music: pygame.mixer.Sound | None = None
+        self.start_sound: pygame.mixer.Sound | None = None
+        self.game_music: pygame.mixer.Sound | None = None
+        self.game_over_music: pygame.mixer.Sound | None = None
+        self.player: Player | None = None
+        self.hud: Hud | None = None
+        self.light_map: LightMap | None = None
+        self.swarm: SpiderSwarm | None = None
+
+        # With a pursuit field, spiders steer towards the player with a lookup instead of computing their way.
+        self.pursuit_field: PursuitField | None = PursuitField(separation=separation) if use_pursuit_field else None
+
+        self.startup_timer.mark("menu assets")
+
+        ##############################
+        # Staged loading.
+        ##############################
+
+        # The kernels only involve computation, so they are compiled or loaded from the disk on a background thread.
+        self.kernels_loader = threading.Thread(
+            target=self.startup_timer.time,
+            args=("kernels (background)", self.load_kernels),
+            daemon=True
+        )
+        self.kernels_loader.start()
+
+        # Images and sounds are decoded on a pool of threads, the menu showing the progress.
+        self.asset_loader = AssetLoader(registry=asset_registry)
+        self.asset_loader.add_progress_callback(self.menu.set_loading_progress)
+
+        # Images are decoded with the transparency their users request, the ground and the color keyed bullet without.
+        for folder in ("general", "hud", "player", "spiders", "weapons"):
+
+            self.asset_loader.queue_folder(
+                Path(constants.GRAPHICS_DIR / folder), alpha=folder not in ("general", "weapons")
+            )
+
+        self.asset_loader.queue_folder(Path(constants.GRAPHICS_DIR / "spiders" / "blood"), alpha=True)
+
+        for folder in ("menu", "general", "player", "spiders"):
+
+            self.asset_loader.queue_folder(Path(constants.AUDIO_DIR / folder))
+
+        # Then, the stages building the gameplay elements from these assets run on the main thread, one per menu frame.
+        self.loading_stages: list[tuple[str, Callable]] = [
+            ("audio", self.load_audio),
+            ("player", self.load_player),
+            ("hud", self.load_hud),
+            ("world", self.load_world)
+        ]
 
         ##############################
         # Events.
         ##############################
 
-        self.event_spider_spawn = pygame.USEREVENT + 1
-        self.event_score_second = pygame.USEREVENT + 2
-        self.event_score_minute = pygame.USEREVENT + 3
+        self.event_score_second = pygame.USEREVENT + 1
+        self.event_score_minute = pygame.USEREVENT + 2
+
+        self.event_periods: dict = {
+            self.event_score_second: 1000,
+            self.event_score_minute: 60000
+        }
+
+        # There's no menu to hide the loading behind when headless.
+        if self.headless:
+            self.finish_loading()
+
+    ##############################
+    # Loading stages.
+    ##############################
+
+    @staticmethod
+    def load_kernels() -> None:
+
+        kernels.load()
+        kernels.warm_up()
+
+    def load_audio(self) -> None:
+
+        self.game_menu_music = asset_registry.get_sound(Path(constants.AUDIO_DIR / "menu" / "game_menu.ogg"), 0.2)
+        self.start_sound = asset_registry.get_sound(Path(constants.AUDIO_DIR / "menu" / "start.wav"), 0.35)
+        self.game_music = asset_registry.get_sound(Path(constants.AUDIO_DIR / "general" / "game_music.ogg"), 0.2)
+        self.game_over_music = asset_registry.get_sound(Path(constants.AUDIO_DIR / "general" / "game_over.wav"))
+
+    def load_player(self) -> None:
+
+        self.player = Player()
+        player_sprite.add(self.player)
+
+    def load_hud(self) -> None:
+
+        self.hud = Hud()
+        self.light_map = LightMap(size=(900, 450), color=(255, 153, 0), intensity=5)
+
+    def load_world(self) -> None:
+
+        self.assets = asset_registry.get_folder(folder=Path(constants.GRAPHICS_DIR / "general"))
+        decal_layer.reset(ground=self.assets.get("ground"))
+        get_bullet_image()
+        bake_rotated_frames()
+
+        # With the swarm engine, spiders are simulated in arrays instead of spider_sprites.
+        self.swarm = SpiderSwarm() if self.use_swarm else None
+        self.player.swarm = self.swarm
+
+    @property
+    def loading_complete(self) -> bool:
+
+        return not self.loading_stages and not self.kernels_loader.is_alive()
 
-        pygame.time.set_timer(self.event_spider_spawn, 350)
-        pygame.time.set_timer(self.event_score_second, 1000)
-        pygame.time.set_timer(self.event_score_minute, 60000)
+    def load_next_stage(self) -> None:
 
-    def display_menu(self) -> None:
+        if self.loading_stages:
+            self.startup_timer.time(*self.loading_stages.pop(0))
 
-        if self.do_game_menu_music:
+    def finish_loading(self) -> None:
+        """Waits for the assets and the kernels, then runs the remaining loading stages at once."""
+
+        self.startup_timer.time("assets (conversion)", self.asset_loader.wait)
+        self.kernels_loader.join()
+
+        while self.loading_stages:
+
+            self.load_next_stage()
+
+    def continue_startup(self) -> None:
+        """Called after every frame: records the startup milestones and runs the next loading stage,
+        then prints the startup report once the game is fully loaded if requested."""
+
+        if "first frame" not in self.startup_timer.milestones:
+
+            self.startup_timer.mark("first frame")
+            self.startup_timer.reach("first frame")
+            return
+
+        if not self.asset_loader.finished:
+
+            self.startup_timer.time("assets (conversion)", self.asset_loader.update)
+
+            if self.asset_loader.finished:
+                self.startup_timer.reach("assets loaded")
+
+        # Stages run on the main thread are held back until the background loading is done, as they would
+        # otherwise compete for the interpreter and stall the menu for much longer than they take on their own.
+        elif not self.kernels_loader.is_alive():
+            self.load_next_stage()
+
+        if "fully loaded" not in self.startup_timer.milestones and self.loading_complete:
+
+            self.startup_timer.reach("fully loaded")
+
+            if self.startup_report:
+                print(self.startup_timer.report())
+
+    ##############################
+    # Update phase, run once per tick.
+    ##############################
+
+    def update_menu(self) -> None:
+
+        # The menu music starts as soon as it is loaded.
+        if self.do_game_menu_music and self.game_menu_music is not None:
 
             self.game_menu_music.play(-1)
             self.do_game_menu_music = False
 
-        self.menu.display()
         self.menu.update()
 
-    def do_game(self) -> None:
+        if self.keys[pygame.K_SPACE]:
+
+            self.finish_loading()
+            self.game_menu_music.stop()
+            self.start_sound.play()
+            self.state = GameState.ACTIVE
+            spawn_scheduler.reset(now=simulation.get_ticks())
+            quality_governor.reset()
+
+            # The generator is seeded again as the game starts, so that the random decisions taken
+            # while loading during the menu, whose length depends on the machine, don't shift the game.
+            simulation.reseed(simulation.seed)
+
+    def update_game(self) -> None:
 
         if self.do_game_music:
 
             self.game_music.play(-1)
             self.do_game_music = False
 
-        self.display_surface.blit(self.assets.get("ground"), (0, 0))
+        if self.interpolate:
+            self.store_positions()
 
-        if self.keys[pygame.K_SPACE]:
+        # The directions of the player are derived from the input once, for everything updated during the tick.
+        input_state: InputState = simulation.input
+        input_state.facing, input_state.aim = self.player.get_direction(input_state.mouse_position)
+
+        if input_state.keys[pygame.K_SPACE]:
 
             position: tuple[int, int] = (int(self.player.rect.centerx), int(self.player.rect.centery))
-            bullet: Bullet = Bullet(player_position=position, player_direction=self.player.direction[0])
+            bullet: Bullet = bullet_pool.acquire(
+                player_position=position,
+                player_direction=input_state.facing,
+                target_position=input_state.mouse_position
+            )
             bullet_sprites.add(bullet)
 
-        spider_blood_effects.draw(self.display_surface)
-        player_blood_effects.draw(self.display_surface)
+        spider_blood_effects.update()
+        player_blood_effects.update()
+        decal_layer.update()
+        self.profiler.mark("blood effects")
 
-        for spider in spider_sprites:
+        for species, position in spawn_scheduler.update(now=simulation.get_ticks(), live=self.live_spiders):
 
-            spider.draw_shadow()
+            self.spawn_spider(species, position)
 
-        self.player.draw_shadow()
+        if self.pursuit_field is not None:
+            self.update_pursuit_field()
 
-        spider_sprites.draw(self.display_surface)
-        bullet_sprites.draw(self.display_surface)
-        player_sprite.draw(self.display_surface)
+        spider_sprites.update(self.player.rect.center, self.pursuit_field)
+
+        if self.swarm is not None:
+            self.swarm.update(self.player.rect.center, self.pursuit_field)
+
+        # The spiders don't move for the rest of the tick, so the player and the bullets share the same hash.
+        spider_hash.build(spider_sprites)
+        self.profiler.mark("spiders")
 
-        spider_blood_effects.update()
-        player_blood_effects.update()
-        spider_sprites.update(self.player.rect.center)
         bullet_sprites.update()
-        player_sprite.update()
+        self.profiler.mark("bullets")
 
+        player_sprite.update(input_state)
         self.hud.update(self.player.hearts, self.player.stamina)
+        self.profiler.mark("player")
+
+        if detect_collision(bullet_sprites, spider_sprites, True, True, spatial_hash=spider_hash):
+            self.hud.player_score += 5
 
-        if detect_collision(bullet_sprites, spider_sprites, True, True):
+        if self.swarm is not None and self.swarm.collide(bullet_sprites, True, True):
             self.hud.player_score += 5
 
+        self.profiler.mark("collision")
+
         self.state = GameState.OVER if not self.player.hearts else self.state
 
-    def do_game_over(self) -> None:
+    def update_game_over(self) -> None:
 
         self.game_music.stop()
 
@@ -134,53 +400,400 @@ class Game:
 
             self.game_over_music.play()
             self.do_game_over_music = False
+            self.renderer.request_full_update()
+
+    @property
+    def live_spiders(self) -> int:
+
+        return len(spider_sprites) + (len(self.swarm) if self.swarm is not None else 0)
+
+    def spawn_spider(self, species: str, position: tuple[int, int]) -> None:
+        """Spawns a spider with the engine simulating them.
+
+        Args:
+            species (str): The species of the spider, "adult" or "baby".
+            position (tuple[int, int]): The top left corner of the spider.
+        """
+
+        if self.swarm is not None:
+            self.swarm.spawn_like_sprite(species, position)
+        elif species == "adult":
+            spider_sprites.add(adult_spider_pool.acquire(spawn_position=position))
+        else:
+            spider_sprites.add(baby_spider_pool.acquire(spawn_position=position))
+
+    def update_pursuit_field(self) -> None:
+
+        positions: np.ndarray | None = None
+
+        # Separation needs the positions of every spider, whichever engine simulates them.
+        if self.pursuit_field.separation:
+
+            positions = np.array([spider.rect.center for spider in spider_sprites], dtype=np.float32).reshape(-1, 2)
+
+            if self.swarm is not None:
+                positions = np.concatenate((positions, self.swarm.positions[:len(self.swarm)]))
+
+        self.pursuit_field.update(self.player.rect.center, positions)
+
+    def store_positions(self) -> None:
+        """Remembers where the moving sprites are before a tick, for the frames rendered during the tick."""
+
+        self.previous_positions = {
+            sprite: sprite.rect.topleft for group in (spider_sprites, bullet_sprites, player_sprite) for sprite in group
+        }
+
+        if self.swarm is not None:
+            self.swarm.store_positions()
+
+    ##############################
+    # Render phase, run once per frame.
+    ##############################
+
+    def render_menu(self, alpha: float) -> None:
+
+        self.menu.display()
+        self.renderer.request_full_update()
+
+    def render_game(self, alpha: float) -> None:
+
+        # Decals stamped and floors recomposed during the ticks are drawn with the background of this frame.
+        decal_changes, floor_recomposed = decal_layer.collect_changes()
+
+        if self.renderer.enabled:
+            self.renderer.restore_background(
+                self.display_surface, decal_layer.floor_surface, changed_rects=decal_changes, changed=floor_recomposed
+            )
+        else:
+            decal_layer.draw(self.display_surface)
+
+        self.profiler.mark("background")
+
+        spider_blood_effects.draw(self.display_surface)
+        player_blood_effects.draw(self.display_surface)
+        self.profiler.mark("blood effects")
+
+        positions: dict = {
+            group: self.get_render_positions(group, alpha) for group in (spider_sprites, bullet_sprites, player_sprite)
+        }
+
+        if quality_governor.tier.shadows:
+
+            self.draw_shadows(spider_sprites, positions[spider_sprites])
+
+            if self.swarm is not None:
+                self.swarm.draw_shadows(alpha)
+
+            self.draw_shadows(player_sprite, positions[player_sprite])
+
+        self.profiler.mark("shadows")
+
+        self.draw_sprites(spider_sprites, positions[spider_sprites])
+
+        if self.swarm is not None:
+            self.swarm.draw(alpha)
+
+        self.draw_sprites(bullet_sprites, positions[bullet_sprites])
+        self.draw_sprites(player_sprite, positions[player_sprite])
+
+        if self.renderer.enabled:
+            self.track_drawn_sprites(positions, alpha)
+
+        self.profiler.mark("sprites")
+
+        # At lower quality tiers, only the first bullets glow.
+        for bullet, (x, y) in list(zip(bullet_sprites, positions[bullet_sprites]))[:quality_governor.tier.max_glows]:
+
+            center: tuple[int, int] = (x + bullet.rect.width // 2, y + bullet.rect.height // 2)
+            bullet.render_light_effect(light_map=self.light_map, position=center)
+
+        self.renderer.add(self.light_map.render(self.display_surface))
+        self.profiler.mark("lights")
+
+        self.player.draw_blood_overlay()
+        self.hud.draw()
+        self.profiler.mark("hud")
+
+        if self.profiler.enabled:
+            self.renderer.add(self.hud.draw_profiler(profiler=self.profiler, entity_counts=self.entity_counts))
+
+        if self.renderer.enabled:
+
+            self.renderer.rects.extend(self.hud.dirty_rects)
+
+            # The blood overlay covers the whole screen.
+            if self.player.blood_overlay_opacity > 0:
+                self.renderer.request_full_update()
+
+    def render_game_over(self, alpha: float) -> None:
 
         self.display_surface.fill((0, 0, 0))
 
-    def do_menu(self) -> None:
+    def draw_shadows(self, sprites, positions: list[tuple[int, int]]) -> None:
 
-        self.display_menu()
+        # Shadows are drawn 4 pixels left and down.
+        shadows: list = [
+            (asset_registry.get_shadow(sprite.image), (x - 4, y + 4)) for sprite, (x, y) in zip(sprites, positions)
+        ]
+        self.display_surface.blits(shadows, doreturn=False)
 
-        if self.keys[pygame.K_SPACE]:
+    def draw_sprites(self, sprites, positions: list[tuple[int, int]]) -> None:
 
-            self.game_menu_music.stop()
-            self.start_sound.play()
-            self.state = GameState.ACTIVE
+        self.display_surface.blits(list(zip([sprite.image for sprite in sprites], positions)), doreturn=False)
+
+    def get_render_positions(self, sprites, alpha: float) -> list[tuple[int, int]]:
+        """Computes where to draw sprites, between their positions before and after the current tick.
+
+        Args:
+            sprites: The sprites.
+            alpha (float): How far to draw the sprites between their stored and current positions.
+
+        Returns:
+            list[tuple[int, int]]: The top left corners to draw the sprites at, in the order of the sprites.
+        """
+
+        if alpha >= 1 or not self.interpolate:
+            return [sprite.rect.topleft for sprite in sprites]
+
+        positions: list[tuple[int, int]] = []
+
+        for sprite in sprites:
+
+            x, y = sprite.rect.topleft
+
+            # Sprites appearing during the tick are drawn where they are.
+            previous_x, previous_y = self.previous_positions.get(sprite, (x, y))
+            positions.append(
+                (round(previous_x + (x - previous_x) * alpha), round(previous_y + (y - previous_y) * alpha))
+            )
+
+        return positions
+
+    def track_drawn_sprites(self, positions: dict, alpha: float) -> None:
+        """Marks the areas covered by the sprites drawn during the frame for the dirty rectangles renderer.
+
+        Args:
+            positions (dict): The positions the moving sprites were drawn at, keyed by group.
+            alpha (float): How far the swarm was drawn between its stored and current positions.
+        """
+
+        self.renderer.add_sprites(spider_blood_effects)
+        self.renderer.add_sprites(player_blood_effects)
+        self.renderer.add_sprites(spider_sprites, shadow=True, positions=positions[spider_sprites])
+        self.renderer.add_sprites(bullet_sprites, positions=positions[bullet_sprites])
+        self.renderer.add_sprites(player_sprite, shadow=True, positions=positions[player_sprite])
+
+        if self.swarm is not None:
+            self.renderer.rects.extend(self.swarm.get_rects(shadow=True, alpha=alpha))
+
+    def do_game(self) -> None:
+        """Updates the active game for a tick, then renders it."""
+
+        self.update_game()
+        self.render_game(alpha=1)
+
+    @property
+    def entity_counts(self) -> dict:
+
+        entity_counts: dict = {
+            "spiders": len(spider_sprites),
+            "bullets": len(bullet_sprites),
+            "spider blood": len(spider_blood_effects),
+            "player blood": len(player_blood_effects),
+            "decals": len(decal_layer),
+            "spawn queue": len(spawn_scheduler.queue),
+            "quality": quality_governor.tier.name,
+            "shadow cache hits": asset_registry.shadow_hits,
+            "shadow cache misses": asset_registry.shadow_misses
+        }
+
+        if self.swarm is not None:
+            entity_counts["swarm"] = len(self.swarm)
+
+        return entity_counts
 
     def handle_events(self) -> None:
 
-        events: list = [event.type for event in pygame.event.get()]
+        raw_events: list = pygame.event.get()
+        events: list = [event.type for event in raw_events]
+
+        if any(event.type == pygame.KEYDOWN and event.key == pygame.K_F3 for event in raw_events):
+            self.profiler.toggle()
+
+        events += self.get_tick_events()
 
         if pygame.QUIT in events:
+            self.save_replay()
             pygame.quit()
             sys.exit()
 
-        if self.event_spider_spawn in events and self.state == GameState.ACTIVE:
-            spider_sprites.add(AdultSpider())
-
         if self.event_score_second in events and self.state == GameState.ACTIVE:
             self.hud.player_score += 1
 
         if self.event_score_minute in events and self.state == GameState.ACTIVE:
             self.hud.player_score += 100
 
+    def get_tick_events(self) -> list:
+        """Generates the timed events of the game from the simulation tick counter,
+        so that they follow the simulated time rather than the wall clock.
+
+        Returns:
+            list: The types of the events due at the current tick.
+        """
+
+        return [
+            event for event, period in self.event_periods.items()
+            if not simulation.tick % (period * TICKS_PER_SECOND // 1000)
+        ]
+
     @property
     def keys(self):
 
-        return pygame.key.get_pressed()
+        return simulation.input.keys
 
-    def run(self) -> None:
+    def step(self) -> None:
+        """Simulates a tick of the game."""
+
+        simulation.advance()
+        self.handle_events()
+        self.game_state_update[self.state]()
+
+    def render(self, alpha: float = 1) -> None:
+        """Draws a frame of the game, without presenting it.
 
-        while True:
+        Args:
+            alpha (float, optional): How far into the next tick the frame is, from 0 to 1,
+                used to interpolate the positions of the sprites.
+        """
 
-            self.handle_events()
-            self.game_state_action[self.state]()
+        self.game_state_render[self.state](alpha)
 
+        # The screen shakes by drawing the whole frame at an offset, which has to be pushed and redrawn entirely.
+        offset: tuple[int, int] = screen_shake.get_offset(now=simulation.get_ticks())
+
+        if offset != (0, 0):
+            self.display_surface.scroll(*offset)
+            self.renderer.request_full_update()
+
+    def present(self) -> None:
+
+        if self.renderer.enabled:
+            self.renderer.present()
+        else:
             pygame.display.update()
-            self.clock.tick(60)
+
+    def save_replay(self) -> None:
+
+        if self.replay is not None:
+            self.replay.save(self.record_file)
+
+    def run(self) -> None:
+        """Runs the game with a fixed timestep: the time elapsed between frames is accumulated and consumed
+        in ticks of TICK_DURATION, then a single frame is rendered. Rendering faster than the ticks simply draws
+        the same state again, or in between ticks when interpolating, and a slow frame is caught up by running
+        several ticks before the next one, so that the game keeps its speed whatever the frame rate.
+        """
+
+        # The first frame shows the first tick.
+        accumulator: float = TICK_DURATION
+
+        # Played back replays stop with their last tick.
+        while not simulation.controls.finished:
+
+            self.profiler.start_frame()
+            ticks: int = 0
+
+            while accumulator >= TICK_DURATION and ticks < MAX_CATCH_UP_TICKS:
+
+                self.step()
+                accumulator -= TICK_DURATION
+                ticks += 1
+
+            # Too far behind, the time that couldn't be caught up with is dropped.
+            if accumulator >= TICK_DURATION:
+                accumulator %= TICK_DURATION
+
+            self.render(alpha=accumulator / TICK_DURATION if self.interpolate else 1)
+            self.present()
+
+            self.continue_startup()
+            frame_time: int = self.clock.tick(self.max_fps)
+            accumulator += frame_time
+            self.profiler.end_frame(frame_time=frame_time)
+
+            # The quality of the effects follows the time the game frames took, the wait for the frame rate cap
+            # excluded. Frames still loading in the background would only lower it for nothing.
+            if self.state == GameState.ACTIVE and self.loading_complete:
+
+                if quality_governor.update(frame_time=self.clock.get_rawtime()):
+                    self.renderer.request_full_update()
+
+    def run_headless(self, ticks: int) -> int:
+        """Steps the game as fast as possible, rendering every tick without presenting the frames.
+
+        Args:
+            ticks (int): The maximum number of ticks to simulate.
+
+        Returns:
+            int: The number of ticks simulated, fewer than requested if the game ended.
+        """
+
+        for tick in range(1, ticks + 1):
+
+            self.step()
+            self.render()
+            self.continue_startup()
+
+            if self.state == GameState.OVER or simulation.controls.finished:
+                return tick
+
+        return ticks
 
 
 if __name__ == '__main__':
 
-    game = Game()
-    game.run()
+    # Messages of the game, such as changes of the quality tier, are printed with their module.
+    logging.basicConfig(level=logging.INFO, format="%(name)s: %(message)s")
+
+    parser = ArgumentParser(description="Spider Smash")
+    parser.add_argument("--headless", action="store_true", help="simulate the game without a display")
+    parser.add_argument("--ticks", type=int, default=36000, help="number of ticks to simulate when headless")
+    parser.add_argument("--swarm", action="store_true", help="simulate spiders with the swarm engine")
+    parser.add_argument("--pursuit-field", action="store_true", help="steer spiders with a pursuit field")
+    parser.add_argument("--separation", action="store_true", help="keep spiders apart, with --pursuit-field")
+    parser.add_argument("--dirty-rects", action="store_true", help="only update the areas of the screen that changed")
+    parser.add_argument("--startup-report", action="store_true", help="print how long the startup steps took")
+    parser.add_argument("--no-atlas", action="store_true", help="load the images even if a sprite atlas was baked")
+    parser.add_argument("--seed", type=int, help="seed of the random number generator")
+    parser.add_argument("--record", type=Path, help="record the game into a replay file")
+    parser.add_argument("--replay", type=Path, help="play a replay file back, unthrottled when headless")
+    parser.add_argument("--interpolate", action="store_true", help="draw the sprites in between ticks")
+    parser.add_argument("--fps", type=int, help="maximum frame rate, 0 for none, the display refresh rate by default")
+    arguments = parser.parse_args()
+
+    # A replay brings its own seed, options and input.
+    replay: Replay | None = Replay.load(arguments.replay) if arguments.replay else None
+
+    game = Game(
+        use_swarm=replay.use_swarm if replay else arguments.swarm,
+        headless=arguments.headless,
+        controls=ReplayControls(replay=replay) if replay else None,
+        dirty_rects=arguments.dirty_rects,
+        startup_report=arguments.startup_report,
+        use_atlas=not arguments.no_atlas,
+        seed=replay.seed if replay else arguments.seed,
+        record=arguments.record,
+        interpolate=arguments.interpolate,
+        max_fps=arguments.fps,
+        use_pursuit_field=replay.use_pursuit_field if replay else arguments.pursuit_field,
+        separation=replay.separation if replay else arguments.separation
+    )
+
+    if arguments.headless:
+        simulated_ticks: int = game.run_headless(ticks=len(replay) if replay else arguments.ticks)
+        game.save_replay()
+        print(f"Simulated ticks: {simulated_ticks}, score: {game.hud.player_score}, hearts: {game.player.hearts}")
+    else:
+        # The game also ends, without quitting, once a replay played back is over.
+        game.run()
+        game.save_replay()
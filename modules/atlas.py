@@ -0,0 +1,133 @@
+"""
+This module contains the sprite atlas, a single image holding every prepared frame of the game
+(sliced, scaled, flipped and rotated), along with an index locating each frame in it.
+Atlases are baked offline by tools/pack_atlas.py and memory-mapped at runtime.
+"""
+
+import json
+import mmap
+import pygame
+from pathlib import Path
+
+from modules import constants
+
+
+ATLAS_DIR: Path = Path(constants.ASSETS_DIR / "atlas")
+ATLAS_INDEX: Path = Path(ATLAS_DIR / "atlas.json")
+
+# The pixels are stored raw, in the layout of surfaces converted with convert_alpha(),
+# so that the atlas can be blitted as is, without being converted or copied.
+PIXEL_FORMAT: str = "BGRA"
+
+
+class SpriteAtlas:
+    """
+    A memory-mapped atlas: its frames are subsurfaces of a single surface, which shares
+    the memory of the mapped file, so loading it neither decodes nor copies any pixel.
+    """
+
+    def __init__(self):
+
+        self.surface: pygame.Surface | None = None
+        self.entries: list[dict] = []
+        self.frames: dict[str, pygame.Surface] = {}
+        self.buffer: mmap.mmap | None = None
+
+    def __len__(self) -> int:
+
+        return len(self.frames)
+
+    def load(self, index_file: Path = ATLAS_INDEX) -> bool:
+        """Maps the pixels of an atlas and builds a subsurface for each of its frames.
+
+        Args:
+            index_file (Path, optional): The index of the atlas.
+
+        Returns:
+            bool: False if there is no atlas to load.
+        """
+
+        if not index_file.exists():
+            return False
+
+        index: dict = json.loads(index_file.read_text())
+
+        with open(index_file.parent / index["pixels"], "rb") as pixels_file:
+
+            # Copy on write, so the frames are never written back to the file.
+            self.buffer = mmap.mmap(pixels_file.fileno(), 0, access=mmap.ACCESS_COPY)
+
+        self.surface = pygame.image.frombuffer(self.buffer, index["size"], index["format"])
+        self.entries = index["frames"]
+        self.frames = {entry["id"]: self.surface.subsurface(entry["rect"]) for entry in self.entries}
+
+        # Files are stored relative to the graphics directory, the asset registry needs their full path.
+        for entry in self.entries:
+
+            if "file" in entry:
+                entry["path"] = Path(constants.GRAPHICS_DIR / entry["file"])
+
+        return True
+
+
+def pack(frames: list[tuple[dict, pygame.Surface]], width: int = 2048, padding: int = 1) -> tuple:
+    """Packs frames into a single surface, in rows of frames sorted by height.
+
+    Args:
+        frames (list[tuple[dict, pygame.Surface]]): The index entry and the image of each frame.
+        width (int, optional): The width of the atlas.
+        padding (int, optional): The space left around each frame.
+
+    Returns:
+        tuple[pygame.Surface, list[dict]]: The atlas and its index entries, each with the rectangle of its frame.
+    """
+
+    x, y, row_height = 0, 0, 0
+    placed: list[tuple[dict, pygame.Surface]] = []
+
+    for entry, image in sorted(frames, key=lambda frame: frame[1].get_height(), reverse=True):
+
+        image_width, image_height = image.get_size()
+
+        if x + image_width > width:
+            x, y, row_height = 0, y + row_height + padding, 0
+
+        entry["rect"] = [x, y, image_width, image_height]
+        placed.append((entry, image))
+        x += image_width + padding
+        row_height = max(row_height, image_height)
+
+    atlas = pygame.Surface((width, y + row_height), pygame.SRCALPHA)
+
+    for entry, image in placed:
+
+        atlas.blit(image, entry["rect"][:2])
+
+    # The index keeps the order the frames were given in, so sources are listed before the frames derived from them.
+    return atlas, [entry for entry, _ in frames]
+
+
+def save(atlas: pygame.Surface, entries: list[dict], index_file: Path = ATLAS_INDEX) -> None:
+    """Writes the pixels of an atlas and its index.
+
+    Args:
+        atlas (pygame.Surface): The packed frames.
+        entries (list[dict]): The index entries of the frames.
+        index_file (Path, optional): Where to write the index, the pixels being written next to it.
+    """
+
+    index_file.parent.mkdir(parents=True, exist_ok=True)
+    pixels_file: Path = index_file.with_suffix(".bgra")
+    pixels_file.write_bytes(pygame.image.tobytes(atlas, PIXEL_FORMAT))
+
+    index: dict = {
+        "format": PIXEL_FORMAT,
+        "size": list(atlas.get_size()),
+        "pixels": pixels_file.name,
+        "frames": entries
+    }
+
+    index_file.write_text(json.dumps(index, indent=1))
+
+
+sprite_atlas = SpriteAtlas()
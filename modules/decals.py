@@ -0,0 +1,186 @@
+"""
+This module contains the decal layer, which bakes blood splats and footprints into the floor.
+"""
+
+import pygame
+
+from modules.quality import quality_governor
+
+
+# Fading of each kind of decal: (lifetime, opacity, hold), in frames and alpha values.
+# A decal is fully opaque during its hold time, then fades linearly from its opacity to 0 until its lifetime ends.
+DECAL_KINDS: dict = {
+    "splat": (600, 100, 100),
+    "footprint": (250, 255, 0)
+}
+
+
+class DecalBucket:
+    """
+    Holds the decals of a kind stamped during the same span of frames, which therefore fade together.
+    The bucket is aged from the middle of its span, so that each of its decals fades and disappears
+    at most half a span earlier or later than it would on its own.
+    """
+
+    def __init__(self, kind: str, birth: int, span: int, size: tuple[int, int]):
+
+        self.kind: str = kind
+        self.birth: int = birth
+        self.span: int = span
+        self.surface: pygame.Surface = pygame.Surface(size, pygame.SRCALPHA)
+        self.rects: list[pygame.Rect] = []
+
+
+class DecalLayer:
+    """
+    An off-screen floor made of the ground and every decal stamped into it, drawn with a single blit.
+    Decals are grouped into age buckets, and the floor is recomposed from the buckets every few frames
+    to fade them, so the cost of drawing the floor doesn't depend on the number of decals.
+    The span of the buckets of a kind is a fraction of its lifetime, so short-lived decals are grouped more finely
+    and every kind keeps the same number of buckets, each decal fading within a tenth of its lifetime by default.
+    """
+
+    def __init__(self, buckets_per_lifetime: int = 5, refresh_interval: int = 10):
+
+        self.buckets_per_lifetime: int = buckets_per_lifetime
+        self.refresh_interval: int = refresh_interval
+        self.tick: int = 0
+        self.buckets: list[DecalBucket] = []
+        self.ground: pygame.Surface | None = None
+        self.floor_surface: pygame.Surface | None = None
+        self.floor_clean: bool = True
+
+        # Footprints left so far, of which only a share is stamped at lower quality tiers.
+        self.footprints: int = 0
+
+        # Changes of the floor since they were last collected, for the dirty rectangles renderer.
+        self.changed_rects: list[pygame.Rect] = []
+        self.recomposed: bool = False
+
+    def __len__(self) -> int:
+
+        return sum(len(bucket.rects) for bucket in self.buckets)
+
+    def get_alpha(self, bucket: DecalBucket) -> int:
+
+        lifetime, opacity, hold = DECAL_KINDS[bucket.kind]
+        age: int = self.tick - bucket.birth - bucket.span // 2
+
+        if age < hold:
+            return 255
+
+        return max(0, int(opacity * (1 - (age - hold) / (lifetime - hold))))
+
+    def reset(self, ground: pygame.Surface) -> None:
+        """Removes every decal and sets the ground the floor is built on.
+
+        Args:
+            ground (pygame.Surface): The clean ground.
+        """
+
+        self.ground = ground
+        self.floor_surface = ground.copy()
+        self.buckets.clear()
+        self.tick = 0
+        self.footprints = 0
+        self.floor_clean = True
+        self.changed_rects = []
+        self.recomposed = True
+
+    def add(self, sprite: pygame.sprite.Sprite) -> None:
+        """Stamps the image of a sprite into the floor, at the position of its rectangle.
+        The sprite is killed once stamped, which gives it back to its object pool. At lower quality tiers,
+        only a share of the footprints is stamped, see QualityTier.footprint_step.
+
+        Args:
+            sprite (pygame.sprite.Sprite): A sprite with a decal_kind attribute, such as SpiderBloodSplat.
+        """
+
+        # Footprints are left out of the game logic, so they are the decals thinned out under load.
+        if sprite.decal_kind == "footprint":
+            self.footprints += 1
+            stamped: bool = not self.footprints % quality_governor.tier.footprint_step
+        else:
+            stamped = True
+
+        if stamped:
+            self.stamp(image=sprite.image, rect=sprite.rect, kind=sprite.decal_kind)
+
+        sprite.kill()
+
+    def stamp(self, image: pygame.Surface, rect: pygame.Rect, kind: str) -> None:
+        """Stamps an image into the floor.
+
+        Args:
+            image (pygame.Surface): The image of the decal.
+            rect (pygame.Rect): The rectangle of the decal, the image is drawn at its top left corner.
+            kind (str): The kind of the decal, see DECAL_KINDS.
+        """
+
+        bucket: DecalBucket | None = next(
+            (bucket for bucket in reversed(self.buckets) if bucket.kind == kind), None
+        )
+
+        if bucket is None or self.tick - bucket.birth >= bucket.span:
+            span: int = max(1, DECAL_KINDS[kind][0] // self.buckets_per_lifetime)
+            bucket = DecalBucket(kind=kind, birth=self.tick, span=span, size=self.ground.get_size())
+            self.buckets.append(bucket)
+
+        bucket.surface.blit(image, rect.topleft)
+        bucket.rects.append(pygame.Rect(rect))
+
+        # The decal appears right away, without waiting for the floor to be recomposed.
+        image.set_alpha(self.get_alpha(bucket))
+        self.changed_rects.append(self.floor_surface.blit(image, rect.topleft))
+        self.floor_clean = False
+
+    def collides(self, rect: pygame.Rect, kind: str) -> bool:
+        """Checks whether a rectangle collides with a live decal of a given kind.
+
+        Args:
+            rect (pygame.Rect): The rectangle to test.
+            kind (str): The kind of decals to test against.
+
+        Returns:
+            bool: True if the rectangle collides with at least one decal.
+        """
+
+        return any(bucket.kind == kind and rect.collidelist(bucket.rects) != -1 for bucket in self.buckets)
+
+    def draw(self, surface: pygame.Surface) -> None:
+
+        surface.blit(self.floor_surface, (0, 0))
+
+    def update(self) -> None:
+
+        self.tick += 1
+
+        if self.tick % self.refresh_interval or self.floor_clean:
+            return
+
+        self.buckets = [bucket for bucket in self.buckets if self.get_alpha(bucket) > 0]
+        self.floor_surface.blit(self.ground, (0, 0))
+
+        for bucket in self.buckets:
+
+            bucket.surface.set_alpha(self.get_alpha(bucket))
+            self.floor_surface.blit(bucket.surface, (0, 0))
+
+        self.floor_clean = not self.buckets
+        self.recomposed = True
+
+    def collect_changes(self) -> tuple[list[pygame.Rect], bool]:
+        """Returns the changes of the floor since the previous call.
+
+        Returns:
+            tuple[list[pygame.Rect], bool]: The areas where decals were stamped, and whether the whole floor changed.
+        """
+
+        changes: tuple[list[pygame.Rect], bool] = self.changed_rects, self.recomposed
+        self.changed_rects = []
+        self.recomposed = False
+
+        return changes
+
+
+decal_layer = DecalLayer()
@@ -4,10 +4,137 @@ of the Heads-Up Display (HUD) by receiving player data to update visual indicato
 """
 
 import pygame
+from abc import ABC, abstractmethod
 from pathlib import Path
 
 from modules import constants
 from modules import toolkit
+from modules.profiler import FrameProfiler
+
+
+class HudWidget(ABC):
+    """
+    A part of the HUD drawn from its own small surface, which is only rendered again when
+    the values it displays change. Subclasses render that surface from the values.
+    """
+
+    def __init__(self, position: tuple[int, int]):
+
+        self.position: tuple[int, int] = position
+        self.surface: pygame.Surface | None = None
+        self.state: tuple | None = None
+
+    @property
+    def rect(self) -> pygame.Rect:
+
+        if self.surface is None:
+            return pygame.Rect(self.position, (0, 0))
+
+        return self.surface.get_rect(topleft=self.position)
+
+    @abstractmethod
+    def render(self, *state) -> pygame.Surface:
+        """Renders the surface of the widget.
+
+        Args:
+            *state: The values displayed by the widget.
+
+        Returns:
+            pygame.Surface: The surface of the widget.
+        """
+
+    def update(self, *state) -> None:
+        """Renders the widget again if the values it displays changed since the previous update.
+
+        Args:
+            *state: The values displayed by the widget.
+        """
+
+        if state != self.state:
+
+            self.state = state
+            self.surface = self.render(*state)
+
+    def draw(self, surface: pygame.Surface) -> None:
+
+        # Nothing to draw before the first update.
+        if self.surface is not None:
+            surface.blit(self.surface, self.position)
+
+
+class HeartsWidget(HudWidget):
+    """Displays one animated heart per heart of the player."""
+
+    def __init__(self, position: tuple[int, int], heart_sprites: list[pygame.Surface], spacing: int = 50):
+
+        super().__init__(position)
+        self.heart_sprites: list[pygame.Surface] = heart_sprites
+        self.spacing: int = spacing
+
+    def render(self, hearts: int, frame_index: int) -> pygame.Surface:
+
+        heart: pygame.Surface = self.heart_sprites[frame_index]
+        width: int = (hearts - 1) * self.spacing + heart.get_width() if hearts else 0
+        surface = pygame.Surface((width, heart.get_height()), pygame.SRCALPHA)
+
+        for i in range(hearts):
+
+            surface.blit(heart, (i * self.spacing, 0))
+
+        return surface
+
+
+class StaminaWidget(HudWidget):
+    """Displays the stamina of the player as a bar, inside its frame."""
+
+    def __init__(self, position: tuple[int, int], frame: pygame.Surface):
+
+        super().__init__(position)
+        self.frame: pygame.Surface = frame
+
+    def render(self, bar_width: int) -> pygame.Surface:
+
+        surface = pygame.Surface(self.frame.get_size(), pygame.SRCALPHA)
+        pygame.draw.rect(surface, (255, 10, 10), (10, 0, bar_width, 18))
+        surface.blit(self.frame, (0, 0))
+
+        return surface
+
+
+class ScoreWidget(HudWidget):
+    """Displays the score, composed from cached glyphs rather than rendered through the font every time."""
+
+    def __init__(self, bottomleft: tuple[int, int], font: pygame.font.Font):
+
+        super().__init__(position=bottomleft)
+        self.bottomleft: tuple[int, int] = bottomleft
+        self.font: pygame.font.Font = font
+        self.glyphs: dict[str, pygame.Surface] = {}
+
+    def get_glyph(self, text: str) -> pygame.Surface:
+
+        if text not in self.glyphs:
+            self.glyphs[text] = self.font.render(text, True, (255, 255, 255))
+
+        return self.glyphs[text]
+
+    def render(self, score: int) -> pygame.Surface:
+
+        glyphs: list[pygame.Surface] = [self.get_glyph("Score: ")] + [self.get_glyph(digit) for digit in str(score)]
+        surface = pygame.Surface(
+            (sum(glyph.get_width() for glyph in glyphs), self.font.get_height()), pygame.SRCALPHA
+        )
+        x: int = 0
+
+        for glyph in glyphs:
+
+            surface.blit(glyph, (x, 0))
+            x += glyph.get_width()
+
+        # The score is anchored by its bottom left corner.
+        self.position = surface.get_rect(bottomleft=self.bottomleft).topleft
+
+        return surface
 
 
 class Hud:
@@ -16,13 +143,11 @@ class Hud:
     def __init__(self):
 
         self.game_surface: pygame.Surface = pygame.display.get_surface()
-        self.hud_surface: pygame.Surface = pygame.Surface((900, 450), pygame.SRCALPHA, 32).convert_alpha()
 
         self.player_hearts: int = 0
         self.player_score: int = 0
-        self.score_font = pygame.font.Font(Path(constants.ASSETS_DIR / "font" / "font.otf"), 16)
-        self.heart_rectangles = None
-        self.stamina_rectangle = None
+        self.score_font = toolkit.asset_registry.get_font(Path(constants.ASSETS_DIR / "font" / "font.otf"), 16)
+        self.profiler_font = toolkit.asset_registry.get_font(Path(constants.ASSETS_DIR / "font" / "font.otf"), 10)
 
         self.frame_index: int = 0
         self.animation_frame_delay: int = 0
@@ -31,22 +156,38 @@ class Hud:
         # Assets.
         ##############################
 
-        self.assets: dict = toolkit.load_images(folder=Path(constants.GRAPHICS_DIR / "hud"), alpha=True)
+        self.assets: dict = toolkit.asset_registry.get_folder(folder=Path(constants.GRAPHICS_DIR / "hud"), alpha=True)
 
-        self.heart_sprites: list[pygame.Surface] = toolkit.SpritesLoader(
+        self.heart_sprites: list[pygame.Surface] = toolkit.asset_registry.get_sprites(
             sprites_image=self.assets.get("animated-heart"),
             sprites_size=128,
-            sprites_number=2
-        ).sprite_surfaces(0.25)
+            sprites_number=2,
+            scale_factor=0.25
+        )
+
+        ##############################
+        # Widgets.
+        ##############################
 
-    def animate_hearts(self) -> pygame.Surface:
+        self.hearts_widget = HeartsWidget(position=(20, 20), heart_sprites=self.heart_sprites)
+        self.stamina_widget = StaminaWidget(position=(660, 20), frame=self.assets.get("stamina"))
+        self.score_widget = ScoreWidget(bottomleft=(20, 430), font=self.score_font)
+        self.widgets: tuple[HudWidget, ...] = (self.hearts_widget, self.stamina_widget, self.score_widget)
+
+    @property
+    def dirty_rects(self) -> list[pygame.Rect]:
+        """The areas of the screen the HUD draws on: hearts, stamina bar and score."""
+
+        return [widget.rect for widget in self.widgets]
+
+    def animate_hearts(self) -> int:
         """This method manages the animation of the hearts shown on the HUD, cycling through the frames
-        of the heart animation at a specified delay. It updates the current frame index and returns
-        the corresponding heart image to be displayed. If the animation frame delay has elapsed,
-        it advances to the next frame; otherwise, it maintains the current frame.
+        of the heart animation at a specified delay. It updates the current frame index and returns it.
+        If the animation frame delay has elapsed, it advances to the next frame; otherwise,
+        it maintains the current frame.
 
         Returns:
-            pygame.Surface: The current frame of the heart animation.
+            int: The index of the current frame of the heart animation.
         """
 
         if self.animation_frame_delay <= 0:
@@ -54,31 +195,69 @@ class Hud:
             self.animation_frame_delay = 15
             self.frame_index = (self.frame_index + 1) % len(self.heart_sprites)
 
-        return self.heart_sprites[self.frame_index]
+        return self.frame_index
 
     def update(self, player_hearts: int, player_stamina: int) -> None:
 
-        self.hud_surface.fill((0, 0, 0, 0))
-
         # Update the variables.
         self.player_hearts = player_hearts
-        self.heart_rectangles = [pygame.rect.Rect(20 + (i * 50), 20, 20, 20) for i in range(self.player_hearts)]
-        self.stamina_rectangle = pygame.rect.Rect(670, 20, player_stamina * 2, 18)
         self.animation_frame_delay -= 1
 
-        # Display the stamina bar.
-        pygame.draw.rect(self.hud_surface, (255, 10, 10), self.stamina_rectangle)
-        self.hud_surface.blit(self.assets.get("stamina"), (660, 20))
+        # Hearts only animate while displayed.
+        frame_index: int = self.animate_hearts() if self.player_hearts else self.frame_index
+
+        # Each widget is only rendered again when the values it displays change.
+        self.hearts_widget.update(self.player_hearts, frame_index)
+        self.stamina_widget.update(max(0, int(player_stamina * 2)))
+        self.score_widget.update(self.player_score)
+
+    def draw(self) -> None:
+
+        for widget in self.widgets:
+
+            widget.draw(self.game_surface)
+
+    def draw_profiler(self, profiler: FrameProfiler, entity_counts: dict) -> pygame.Rect:
+        """Displays the profiler overlay: frame time percentiles, the average duration
+        of each stage of the frame and the number of live entities.
+
+        Args:
+            profiler (FrameProfiler): The profiler of the game.
+            entity_counts (dict): The number of entities, keyed by name.
+
+        Returns:
+            pygame.Rect: The area of the screen covered by the overlay.
+        """
+
+        # Each line is made of a label and a value, displayed in two columns.
+        lines: list[tuple[str, str]] = []
+
+        for percentile, frame_time in profiler.get_frame_time_percentiles().items():
+
+            fps: float = 1000 / frame_time if frame_time else 0
+            lines.append((f"p{percentile} frame", f"{frame_time:.2f} ms  {fps:.0f} fps"))
+
+        lines.append(("", ""))
+
+        for stage, duration in profiler.get_stage_averages().items():
+
+            lines.append((stage, f"{duration:.2f} ms"))
+
+        lines.append(("", ""))
+
+        for name, count in entity_counts.items():
+
+            lines.append((name, str(count)))
 
-        # Display and update the hearts.
-        for heart in self.heart_rectangles:
+        line_height: int = self.profiler_font.get_linesize()
+        panel = pygame.Surface((220, line_height * len(lines) + 10), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
 
-            self.hud_surface.blit(self.animate_hearts(), heart)
+        for i, (label, value) in enumerate(lines):
 
-        # Display score.
-        score_str: str = f"Score: {str(self.player_score)}"
-        score = self.score_font.render(score_str, True, (255, 255, 255))
-        score_rectangle = score.get_rect(bottomleft=(20, 430))
-        self.hud_surface.blit(score, score_rectangle)
+            y: int = 5 + i * line_height
+            value_surface: pygame.Surface = self.profiler_font.render(value, True, (255, 255, 255))
+            panel.blit(self.profiler_font.render(label, True, (255, 255, 255)), (5, y))
+            panel.blit(value_surface, value_surface.get_rect(topright=(215, y)))
 
-        self.game_surface.blit(self.hud_surface, (0, 0))
+        return self.game_surface.blit(panel, (670, 50))
@@ -0,0 +1,163 @@
+"""
+This module contains the numerical kernels of the game, compiled by Numba with explicit signatures
+and cached on disk, so that they are compiled once when first imported instead of on the first call
+in the middle of a game. They only deal with numbers: toolkit wraps them to expose pygame types and enums.
+"""
+
+import numpy as np
+from math import sqrt
+from time import perf_counter
+from numba import njit, int8, int64, float32, float64, boolean, types
+
+
+# Integer codes of the directions, in the declaration order of toolkit.Direction.
+NORTHWEST: int = 0
+NORTH: int = 1
+NORTHEAST: int = 2
+EAST: int = 3
+SOUTHEAST: int = 4
+SOUTH: int = 5
+SOUTHWEST: int = 6
+WEST: int = 7
+NONE: int = NORTH
+
+
+@njit(int8(int64, int64, int64), cache=True)
+def direction_code(dx, dy, margin):
+    """Determine the direction of movement based on horizontal and vertical components.
+
+    Args:
+        dx (int): The horizontal component of the movement.
+        dy (int): The vertical component of the movement.
+        margin (int): The margin of error to consider for horizontal and vertical movements.
+
+    Returns:
+        int: The code of the direction of movement, see toolkit.DIRECTIONS.
+    """
+
+    # If dy is within the margin, it indicates horizontal movement.
+    if abs(dy) < margin:
+
+        if dx < 0:
+            return WEST
+        elif dx > 0:
+            return EAST
+
+    # If dx is within the margin, it indicates vertical movement.
+    elif abs(dx) < margin:
+
+        if dy < 0:
+            return NORTH
+        elif dy > 0:
+            return SOUTH
+
+    # If neither dx nor dy are within the margin, consider diagonal movement.
+    else:
+
+        if dy < 0:
+            return NORTHWEST if dx < 0 else NORTHEAST
+        elif dy > 0:
+            return SOUTHWEST if dx < 0 else SOUTHEAST
+
+    return NONE
+
+
+@njit(int8[:](float32[:], float32[:], int64), cache=True)
+def direction_codes(dx, dy, margin):
+    """Batched version of direction_code, determining many directions at once.
+
+    Args:
+        dx (np.ndarray): The horizontal components of the movements.
+        dy (np.ndarray): The vertical components of the movements.
+        margin (int): The margin of error to consider for horizontal and vertical movements.
+
+    Returns:
+        np.ndarray: The codes of the directions of movement.
+    """
+
+    codes = np.empty(dx.shape[0], dtype=np.int8)
+
+    for i in range(dx.shape[0]):
+
+        # Components are truncated to integers, as done by the callers of direction_code.
+        codes[i] = direction_code(int64(dx[i]), int64(dy[i]), margin)
+
+    return codes
+
+
+@njit(types.UniTuple(float64, 2)(float64, float64, float64, float64, float64, float64), cache=True)
+def movement(destination_x, destination_y, x, y, dead_zone, velocity):
+    """Calculate the movement required to reach a destination point.
+
+    Args:
+        destination_x (float): The horizontal coordinate to move towards.
+        destination_y (float): The vertical coordinate to move towards.
+        x (float): The current horizontal coordinate.
+        y (float): The current vertical coordinate.
+        dead_zone (float): The radius within which no movement is necessary.
+        velocity (float): The speed at which the object should move.
+
+    Returns:
+        tuple[float, float]: The horizontal and vertical movement, (0, 0) within the dead zone.
+    """
+
+    dx = destination_x - x
+    dy = destination_y - y
+    distance = sqrt(dx ** 2 + dy ** 2)
+
+    if distance > dead_zone:
+        return dx / distance * velocity, dy / distance * velocity
+    return 0.0, 0.0
+
+
+@njit(boolean[:](float32[:, :], float64, float64, float64, float32[:], float32[:], float32[:]), cache=True)
+def pursue(positions, destination_x, destination_y, dead_zone, velocities, dx, dy):
+    """Batched version of movement, moving many positions towards the same destination in place.
+
+    Args:
+        positions (np.ndarray): The (x, y) positions to move, updated in place.
+        destination_x (float): The horizontal coordinate to move towards.
+        destination_y (float): The vertical coordinate to move towards.
+        dead_zone (float): The radius within which no movement is necessary.
+        velocities (np.ndarray): The speed of each position.
+        dx (np.ndarray): Receives the horizontal distance from each position to the destination, before moving.
+        dy (np.ndarray): Receives the vertical distance from each position to the destination, before moving.
+
+    Returns:
+        np.ndarray: Whether each position moved, that is whether it was outside of the dead zone.
+    """
+
+    moving = np.empty(positions.shape[0], dtype=np.bool_)
+
+    for i in range(positions.shape[0]):
+
+        dx[i] = destination_x - positions[i, 0]
+        dy[i] = destination_y - positions[i, 1]
+        distance = sqrt(dx[i] ** 2 + dy[i] ** 2)
+        moving[i] = distance > dead_zone
+
+        if moving[i]:
+            positions[i, 0] += dx[i] / distance * velocities[i]
+            positions[i, 1] += dy[i] / distance * velocities[i]
+
+    return moving
+
+
+def warm_up() -> float:
+    """Runs every kernel once, so that the first frames of a game don't pay for loading them.
+    The kernels are compiled, or loaded from the disk cache, when this module is imported.
+
+    Returns:
+        float: The time spent in milliseconds.
+    """
+
+    start: float = perf_counter()
+    positions = np.zeros((1, 2), dtype=np.float32)
+    values = np.zeros(1, dtype=np.float32)
+
+    direction_code(0, 0, 60)
+    direction_codes(values, values, 60)
+    movement(0, 0, 0, 0, 10, 1)
+    pursue(positions, 0, 0, 10, values, values.copy(), values.copy())
+
+    return (perf_counter() - start) * 1000
@@ -13,10 +13,10 @@ class GameMenu:
     def __init__(self):
 
         self.display_surface = pygame.display.get_surface()
-        self.images: dict = toolkit.load_images(folder=Path(constants.GRAPHICS_DIR / "menu"), alpha=True)
+        self.images: dict = toolkit.asset_registry.get_folder(folder=Path(constants.GRAPHICS_DIR / "menu"), alpha=True)
         self.text_direction: bool = True
-        game_font_big = pygame.font.Font(Path(constants.ASSETS_DIR / "font" / "font.otf"), 50)
-        game_font_small = pygame.font.Font(Path(constants.ASSETS_DIR / "font" / "font.otf"), 25)
+        game_font_big = toolkit.asset_registry.get_font(Path(constants.ASSETS_DIR / "font" / "font.otf"), 50)
+        game_font_small = toolkit.asset_registry.get_font(Path(constants.ASSETS_DIR / "font" / "font.otf"), 25)
 
         self.game_title = game_font_big.render("Spider Smash", True, (255, 255, 255))
         self.game_title_rect = self.game_title.get_rect(midbottom=(450, 0))
@@ -29,6 +29,11 @@ class GameMenu:
         self.menu_text_rect = self.menu_text.get_rect(center=(450, 380))
         self.menu_text_outline_rect = self.menu_text_outline.get_rect(center=(453, 377))
 
+        # The progress of the assets loaded while the menu is displayed, shown as a bar until complete.
+        self.loading_progress: float = 1
+        self.loading_bar_rect = pygame.Rect(0, 0, 300, 6)
+        self.loading_bar_rect.midbottom = (450, 435)
+
     def animate_light(self):
 
         self.game_title_light_rect.right += 55
@@ -45,6 +50,27 @@ class GameMenu:
         if self.menu_text_rect.right >= 900 or self.menu_text_rect.left <= 0:
             self.text_direction = not self.text_direction
 
+    def set_loading_progress(self, loaded: int, total: int) -> None:
+        """Progress callback of the asset loader.
+
+        Args:
+            loaded (int): The number of loaded assets.
+            total (int): The number of assets to load.
+        """
+
+        self.loading_progress = loaded / total if total else 1
+
+    def draw_loading_progress(self):
+
+        if self.loading_progress >= 1:
+            return
+
+        progress_rect = self.loading_bar_rect.copy()
+        progress_rect.width = int(self.loading_bar_rect.width * self.loading_progress)
+
+        pygame.draw.rect(self.display_surface, (255, 255, 255), progress_rect)
+        pygame.draw.rect(self.display_surface, (255, 255, 255), self.loading_bar_rect, 1)
+
     def display(self):
 
         self.display_surface.fill((0, 0, 0))
@@ -54,6 +80,17 @@ class GameMenu:
         self.display_surface.blit(self.images.get("title_frame"), self.game_title_frame_rect)
         self.display_surface.blit(self.images.get("light"), self.game_title_light_rect)
 
+        if self.menu_text_shown:
+            self.display_surface.blit(self.menu_text, self.menu_text_rect)
+            self.display_surface.blit(self.menu_text_outline, self.menu_text_outline_rect)
+
+        self.draw_loading_progress()
+
+    @property
+    def menu_text_shown(self) -> bool:
+
+        return self.game_title_background_rect.left == 0 and self.game_title_frame_rect.centery == 110
+
     def update(self):
 
         if self.background_rect.right < 900:
@@ -71,7 +108,5 @@ class GameMenu:
         if self.game_title_frame_rect.centery == 110 and self.game_title_light_rect.left < 900:
             self.animate_light()
 
-        if self.game_title_background_rect.left == 0 and self.game_title_frame_rect.centery == 110:
-            self.display_surface.blit(self.menu_text, self.menu_text_rect)
-            self.display_surface.blit(self.menu_text_outline, self.menu_text_outline_rect)
+        if self.menu_text_shown:
             self.animate_menu_text()
@@ -4,12 +4,14 @@ Contains everything related to the playable character.
 
 import pygame
 from pathlib import Path
-from random import choice
 
 from modules import constants
 from modules import toolkit
+from modules.decals import decal_layer
 from modules.toolkit import Direction as Drc
-from modules.spiders import spider_sprites, spider_blood_effects
+from modules.spiders import spider_hash, spider_sprites, spider_blood_effects
+from modules.swarm import SpiderSwarm
+from modules.simulation import InputState, simulation
 
 
 player_sprite = pygame.sprite.GroupSingle()
@@ -25,88 +27,109 @@ class Player(pygame.sprite.Sprite):
         # Assets.
         ##############################
 
-        self.assets: dict = toolkit.load_images(folder=Path(constants.GRAPHICS_DIR / "player"), alpha=True)
+        self.assets: dict = toolkit.asset_registry.get_folder(
+            folder=Path(constants.GRAPHICS_DIR / "player"),
+            alpha=True
+        )
 
-        self.front_idle_sprites: list[pygame.Surface] = toolkit.SpritesLoader(
+        self.front_idle_sprites: list[pygame.Surface] = toolkit.asset_registry.get_sprites(
             sprites_image=self.assets.get("front_hero_idle"),
             sprites_size=64,
             sprites_number=8
-        ).sprite_surfaces()
+        )
 
-        self.back_idle_sprites: list[pygame.Surface] = toolkit.SpritesLoader(
+        self.back_idle_sprites: list[pygame.Surface] = toolkit.asset_registry.get_sprites(
             sprites_image=self.assets.get("back_hero_idle"),
             sprites_size=64,
             sprites_number=8
-        ).sprite_surfaces()
+        )
 
-        self.left_idle_sprites: list[pygame.Surface] = toolkit.SpritesLoader(
+        self.left_idle_sprites: list[pygame.Surface] = toolkit.asset_registry.get_sprites(
             sprites_image=self.assets.get("left_hero_idle"),
             sprites_size=64,
             sprites_number=8
-        ).sprite_surfaces()
+        )
 
-        self.right_idle_sprites: list[pygame.Surface] = [
-            pygame.transform.flip(surface, True, False) for surface in self.left_idle_sprites
-        ]
+        self.right_idle_sprites: list[pygame.Surface] = toolkit.asset_registry.get_sprites(
+            sprites_image=self.assets.get("left_hero_idle"),
+            sprites_size=64,
+            sprites_number=8,
+            flip=True
+        )
 
-        self.front_run_sprites: list[pygame.Surface] = toolkit.SpritesLoader(
+        self.front_run_sprites: list[pygame.Surface] = toolkit.asset_registry.get_sprites(
             sprites_image=self.assets.get("front_hero_run"),
             sprites_size=64,
             sprites_number=8
-        ).sprite_surfaces()
+        )
 
-        self.back_run_sprites: list[pygame.Surface] = toolkit.SpritesLoader(
+        self.back_run_sprites: list[pygame.Surface] = toolkit.asset_registry.get_sprites(
             sprites_image=self.assets.get("back_hero_run"),
             sprites_size=64,
             sprites_number=8
-        ).sprite_surfaces()
+        )
 
-        self.left_run_sprites: list[pygame.Surface] = toolkit.SpritesLoader(
+        self.left_run_sprites: list[pygame.Surface] = toolkit.asset_registry.get_sprites(
             sprites_image=self.assets.get("left_hero_run"),
             sprites_size=64,
             sprites_number=8
-        ).sprite_surfaces()
+        )
 
-        self.right_run_sprites: list[pygame.Surface] = [
-            pygame.transform.flip(surface, True, False) for surface in self.left_run_sprites
-        ]
+        self.right_run_sprites: list[pygame.Surface] = toolkit.asset_registry.get_sprites(
+            sprites_image=self.assets.get("left_hero_run"),
+            sprites_size=64,
+            sprites_number=8,
+            flip=True
+        )
 
-        self.front_walk_sprites: list[pygame.Surface] = toolkit.SpritesLoader(
+        self.front_walk_sprites: list[pygame.Surface] = toolkit.asset_registry.get_sprites(
             sprites_image=self.assets.get("front_hero_walk"),
             sprites_size=64,
             sprites_number=8
-        ).sprite_surfaces()
+        )
 
-        self.back_walk_sprites: list[pygame.Surface] = toolkit.SpritesLoader(
+        self.back_walk_sprites: list[pygame.Surface] = toolkit.asset_registry.get_sprites(
             sprites_image=self.assets.get("back_hero_walk"),
             sprites_size=64,
             sprites_number=8
-        ).sprite_surfaces()
+        )
 
-        self.left_walk_sprites: list[pygame.Surface] = toolkit.SpritesLoader(
+        self.left_walk_sprites: list[pygame.Surface] = toolkit.asset_registry.get_sprites(
             sprites_image=self.assets.get("left_hero_walk"),
             sprites_size=64,
             sprites_number=8
-        ).sprite_surfaces()
+        )
 
-        self.right_walk_sprites: list[pygame.Surface] = [
-            pygame.transform.flip(surface, True, False) for surface in self.left_walk_sprites
-        ]
+        self.right_walk_sprites: list[pygame.Surface] = toolkit.asset_registry.get_sprites(
+            sprites_image=self.assets.get("left_hero_walk"),
+            sprites_size=64,
+            sprites_number=8,
+            flip=True
+        )
 
         self.bite_sounds: list = [
-            pygame.mixer.Sound(Path(constants.AUDIO_DIR / "spiders", f"spider_bite_0{i}.ogg")) for i in range(1, 3)
+            toolkit.asset_registry.get_sound(Path(constants.AUDIO_DIR / "spiders", f"spider_bite_0{i}.ogg"), 0.4)
+            for i in range(1, 3)
         ]
 
-        for bite_sound in self.bite_sounds:
-
-            bite_sound.set_volume(0.4)
-
-        self.blood_steps = pygame.mixer.Sound(Path(constants.AUDIO_DIR / "player", "blood_footsteps.wav"))
-        self.blood_steps_02 = pygame.mixer.Sound(Path(constants.AUDIO_DIR / "player", "blood_footsteps_02.wav"))
+        self.blood_steps = toolkit.asset_registry.get_sound(
+            Path(constants.AUDIO_DIR / "player", "blood_footsteps.wav")
+        )
+        self.blood_steps_02 = toolkit.asset_registry.get_sound(
+            Path(constants.AUDIO_DIR / "player", "blood_footsteps_02.wav")
+        )
         self.footsteps_sound: list = [self.blood_steps, self.blood_steps_02]
 
         ##############################
 
+        for sprites in (
+            self.front_idle_sprites, self.back_idle_sprites, self.left_idle_sprites, self.right_idle_sprites,
+            self.front_run_sprites, self.back_run_sprites, self.left_run_sprites, self.right_run_sprites,
+            self.front_walk_sprites, self.back_walk_sprites, self.left_walk_sprites, self.right_walk_sprites
+        ):
+            toolkit.asset_registry.bake_shadows(sprites)
+            toolkit.asset_registry.bake_masks(sprites)
+
         self.idle_direction_dict: dict = {
             Drc.NORTH: self.back_idle_sprites,
             Drc.SOUTH: self.front_idle_sprites,
@@ -131,6 +154,8 @@ class Player(pygame.sprite.Sprite):
         ##############################
 
         self.game_surface = pygame.display.get_surface()
+        self.swarm: SpiderSwarm | None = None
+        self.input_state: InputState = InputState()
         self.velocity: int = 3
         self.stamina: int = 100
         self.hearts: int = 5
@@ -155,10 +180,17 @@ class Player(pygame.sprite.Sprite):
         self.image = self.front_idle_sprites[self.idle_frame_index]
         self.rect = pygame.rect.Rect(434, 209, 32, 32)
 
-    @property
-    def direction(self) -> tuple[toolkit.Direction, toolkit.Direction]:
+    def get_direction(self, mouse_position: tuple[int, int]) -> tuple[toolkit.Direction, toolkit.Direction]:
+        """Determines where the player faces and aims, towards the mouse.
+
+        Args:
+            mouse_position (tuple[int, int]): The position of the mouse.
+
+        Returns:
+            tuple[toolkit.Direction, toolkit.Direction]: The facing direction, only north, south, east or west
+            as the player has no diagonal sprites, and the aim direction.
+        """
 
-        mouse_position: tuple[int, int] = pygame.mouse.get_pos()
         dx: int = int(mouse_position[0] - self.rect.centerx)
         dy: int = int(mouse_position[1] - self.rect.centery)
         direction: toolkit.Direction = toolkit.get_direction(dx=dx, dy=dy)
@@ -178,38 +210,44 @@ class Player(pygame.sprite.Sprite):
         if self.footprint_duration > 0:
 
             shoe_print_position: tuple[int, int] = (int(self.rect.centerx), int(self.rect.centery))
-            player_blood_effects.add(ShoePrint(shoe_print_position, self.direction[1]))  # type: ignore
+            decal_layer.add(shoe_print_pool.acquire(shoe_print_position, self.input_state.aim))
 
-    def draw_shadow(self) -> None:
+    def draw_blood_overlay(self) -> None:
 
-        player_shadow: pygame.Surface = toolkit.get_shadow_surface(self.image)
-        self.game_surface.blit(player_shadow, (self.rect.x - 4, self.rect.y + 4))
+        self.assets.get("blood_overlay").set_alpha(self.blood_overlay_opacity)
+        self.game_surface.blit(self.assets.get("blood_overlay"), (0, 0))
 
     def idle_animation(self) -> None:
 
         self.animation_frame_delay = 4
         self.idle_frame_index = (self.idle_frame_index + 1) % 8
-        self.image = self.idle_direction_dict.get(self.direction[0])[self.idle_frame_index]
+        self.image = self.idle_direction_dict.get(self.input_state.facing)[self.idle_frame_index]
+
+    @property
+    def mask(self) -> pygame.mask.Mask:
+
+        return toolkit.asset_registry.get_mask(self.image)
 
     def minus_one_heart(self) -> None:
 
         if self.hearts and not self.invulnerable:
 
-            choice(self.bite_sounds).play()
+            simulation.random.choice(self.bite_sounds).play()
             self.blood_overlay_opacity: int = 255
-            toolkit.shake_screen(surface=self.game_surface)
+            toolkit.screen_shake.start(now=self.now)
+
             self.hearts -= 1
 
     @property
     def now(self) -> int:
 
-        return pygame.time.get_ticks()
+        return simulation.get_ticks()
 
     def run_animation(self) -> None:
 
         self.animation_frame_delay = 2
         self.run_frame_index = (self.run_frame_index + 1) % 8
-        self.image = self.run_direction_dict.get(self.direction[0])[self.run_frame_index]
+        self.image = self.run_direction_dict.get(self.input_state.facing)[self.run_frame_index]
 
     def set_invulnerable(self, duration: int) -> None:
 
@@ -217,14 +255,13 @@ class Player(pygame.sprite.Sprite):
             self.invulnerability_time = self.now + duration
             self.invulnerable = True
 
-    def update(self) -> None:
+    def update(self, input_state: InputState) -> None:
 
-        self.assets.get("blood_overlay").set_alpha(self.blood_overlay_opacity)
-        self.game_surface.blit(self.assets.get("blood_overlay"), (0, 0))
-        self.blood_overlay_opacity -= 1
+        self.input_state = input_state
+        self.blood_overlay_opacity = max(0, self.blood_overlay_opacity - 1)
 
         mov_x, mov_y = toolkit.calculate_movement(
-            destination=pygame.mouse.get_pos(),
+            destination=input_state.mouse_position,
             rect_xy=(int(self.rect.centerx), int(self.rect.centery)),
             dead_zone=self.dead_zone,
             velocity=self.velocity
@@ -233,7 +270,7 @@ class Player(pygame.sprite.Sprite):
         self.rect.move_ip(mov_x, mov_y)
         self.animation = 0 if (mov_x, mov_y) == (0, 0) else 1
 
-        press_run = pygame.mouse.get_pressed()[2]
+        press_run = input_state.mouse_buttons[2]
 
         if press_run and self.stamina > 0:
             self.animation = 2
@@ -245,7 +282,12 @@ class Player(pygame.sprite.Sprite):
 
         self.invulnerable = False if self.invulnerability_time <= self.now else self.invulnerable
 
-        if toolkit.detect_collision(player_sprite, spider_sprites, False, False):
+        bitten: bool = toolkit.detect_collision(player_sprite, spider_sprites, False, False, spatial_hash=spider_hash)
+
+        if not bitten and self.swarm is not None:
+            bitten = self.swarm.collide(player_sprite, False, False)
+
+        if bitten:
 
             self.minus_one_heart()
             self.set_invulnerable(duration=1200)
@@ -256,14 +298,17 @@ class Player(pygame.sprite.Sprite):
 
             self.play_animation[self.animation]()
 
-        if pygame.sprite.groupcollide(player_sprite, spider_blood_effects, False, False):
+        if (
+            toolkit.detect_collision(player_sprite, spider_blood_effects, False, False, use_mask=False)
+            or decal_layer.collides(self.rect, "splat")
+        ):
 
             self.footprint_duration = 100
             self.footsteps_sound_delay = 100 if self.footsteps_sound_delay <= 0 else self.footsteps_sound_delay
 
             if not self.footsteps_sound_delay % 20 and self.animation == 1:
 
-                choice(self.footsteps_sound).play()
+                simulation.random.choice(self.footsteps_sound).play()
 
         self.footsteps_sound_delay -= 1
 
@@ -279,33 +324,43 @@ class Player(pygame.sprite.Sprite):
 
         self.animation_frame_delay = 4
         self.walk_frame_index = (self.walk_frame_index + 1) % 8
-        self.image = self.walk_direction_dict.get(self.direction[0])[self.walk_frame_index]
+        self.image = self.walk_direction_dict.get(self.input_state.facing)[self.walk_frame_index]
 
 
 class ShoePrint(pygame.sprite.Sprite):
+    """
+    A footprint left by the player after walking in blood, baked into the floor by the decal layer, which fades it.
+    """
+
+    decal_kind: str = "footprint"
 
     def __init__(self, position: tuple[int, int], player_direction: toolkit.Direction):
         super().__init__()
 
         shoe_print_file: Path = Path(constants.GRAPHICS_DIR / "player", "shoe_print.png")
-        shoe_print: pygame.Surface = pygame.image.load(shoe_print_file).convert_alpha()
+        self.shoe_print: pygame.Surface = toolkit.asset_registry.get_image(shoe_print_file, alpha=True)
 
-        self.opacity: int = 255
-        self.image = self.process_image(surface=shoe_print, direction=player_direction)
-        self.rect = pygame.rect.Rect(*position, 32, 32)
+        self.pooled: bool = False
+        self.reset(position=position, player_direction=player_direction)
+
+    def kill(self) -> None:
+
+        super().kill()
+        toolkit.release(self)
 
     @staticmethod
     def process_image(surface: pygame.Surface, direction: toolkit.Direction) -> pygame.Surface:
 
-        scaled_image: pygame.Surface = pygame.transform.scale(surface, (32, 32))
+        scaled_image: pygame.Surface = toolkit.asset_registry.get_scaled(surface, (32, 32))
         rotated_image: pygame.Surface = pygame.transform.rotate(scaled_image, direction.value)
 
         return rotated_image
 
-    def update(self):
+    def reset(self, position: tuple[int, int], player_direction: toolkit.Direction) -> None:
+        """Prints the footprint again at a new position, so that it can be recycled by an object pool."""
+
+        self.image = self.process_image(surface=self.shoe_print, direction=player_direction)
+        self.rect = pygame.rect.Rect(*position, 32, 32)
 
-        self.opacity = self.opacity - 1 if self.opacity > 0 else 0
-        self.image.set_alpha(self.opacity)
 
-        if self.opacity <= 5:
-            self.kill()
+shoe_print_pool = toolkit.ObjectPool(ShoePrint, cap=16)
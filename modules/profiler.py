@@ -0,0 +1,154 @@
+"""
+This module contains the frame profiler, which times the stages of a frame for the profiler overlay,
+and the startup timer, which times the steps of the startup up to the first frame.
+"""
+
+from collections import deque
+from time import perf_counter
+from typing import Callable
+
+
+class FrameProfiler:
+    """
+    Records rolling frame times and the time spent in each stage of a frame.
+    While disabled, every method returns immediately, so the instrumentation can stay in place.
+    """
+
+    def __init__(self, history: int = 120):
+
+        self.enabled: bool = False
+        self.history: int = history
+        self.frame_times: deque = deque(maxlen=history)
+        self.stage_times: dict = {}
+        self.current_stages: dict = {}
+        self.last_mark: float = 0
+
+    def toggle(self) -> None:
+
+        self.enabled = not self.enabled
+        self.frame_times.clear()
+        self.stage_times.clear()
+
+    def start_frame(self) -> None:
+
+        if not self.enabled:
+            return
+
+        self.current_stages = {}
+        self.last_mark = perf_counter()
+
+    def mark(self, stage: str) -> None:
+        """Attributes the time elapsed since the previous mark to a stage.
+        A stage marked several times during a frame accumulates its durations.
+
+        Args:
+            stage (str): The name of the stage that just ended.
+        """
+
+        if not self.enabled:
+            return
+
+        now: float = perf_counter()
+        self.current_stages[stage] = self.current_stages.get(stage, 0) + (now - self.last_mark) * 1000
+        self.last_mark = now
+
+    def end_frame(self, frame_time: float) -> None:
+        """Stores the duration of the frame along with the durations of its stages.
+
+        Args:
+            frame_time (float): The duration of the whole frame in milliseconds.
+        """
+
+        if not self.enabled:
+            return
+
+        self.frame_times.append(frame_time)
+
+        for stage, duration in self.current_stages.items():
+
+            self.stage_times.setdefault(stage, deque(maxlen=self.history)).append(duration)
+
+        self.current_stages = {}
+
+    def get_frame_time_percentiles(self, percentiles: tuple = (50, 95, 99)) -> dict:
+        """Computes percentiles of the rolling frame times.
+
+        Args:
+            percentiles (tuple, optional): The percentiles to compute.
+
+        Returns:
+            dict: The frame time in milliseconds for each percentile.
+        """
+
+        if not self.frame_times:
+            return {percentile: 0 for percentile in percentiles}
+
+        frame_times: list[float] = sorted(self.frame_times)
+        last_index: int = len(frame_times) - 1
+
+        return {percentile: frame_times[round(last_index * percentile / 100)] for percentile in percentiles}
+
+    def get_stage_averages(self) -> dict:
+        """Computes the average duration of each stage over the rolling history.
+
+        Returns:
+            dict: The average duration in milliseconds for each stage, in the order they were first marked.
+        """
+
+        return {stage: sum(durations) / len(durations) for stage, durations in self.stage_times.items()}
+
+
+class StartupTimer:
+    """
+    Records how long each step of the startup takes, along with the time elapsed
+    from the start of the process to milestones such as the first frame.
+    """
+
+    def __init__(self, start: float):
+
+        self.start: float = start
+        self.last_mark: float = start
+        self.durations: dict = {}
+        self.milestones: dict = {}
+
+    def mark(self, step: str) -> None:
+        """Attributes the time elapsed since the previous mark to a step of the startup.
+
+        Args:
+            step (str): The name of the step that just ended.
+        """
+
+        now: float = perf_counter()
+        self.durations[step] = (now - self.last_mark) * 1000
+        self.last_mark = now
+
+    def time(self, step: str, function: Callable) -> None:
+        """Runs and times a step of the startup which doesn't follow the previous one,
+        such as a loading stage run between menu frames or on a background thread.
+        A step timed several times accumulates its durations.
+
+        Args:
+            step (str): The name of the step.
+            function (Callable): The function running the step.
+        """
+
+        start: float = perf_counter()
+        function()
+        self.durations[step] = self.durations.get(step, 0) + (perf_counter() - start) * 1000
+
+    def reach(self, milestone: str) -> None:
+        """Records the time elapsed from the start of the process to a milestone.
+
+        Args:
+            milestone (str): The name of the milestone, such as "first frame".
+        """
+
+        self.milestones[milestone] = (perf_counter() - self.start) * 1000
+
+    def report(self) -> str:
+
+        lines: list[str] = ["Startup report:"]
+        lines += [f"  {step:<24} {duration:>9.1f} ms" for step, duration in self.durations.items()]
+        lines += [f"  time to {milestone:<16} {elapsed:>9.1f} ms" for milestone, elapsed in self.milestones.items()]
+
+        return "\n".join(lines)
@@ -0,0 +1,178 @@
+"""
+This module contains the pursuit field, an optional alternative to each spider seeking the player on its own:
+a grid over the arena storing the way to the player from every cell, so that steering a spider is a lookup.
+"""
+
+import numpy as np
+
+from modules import toolkit
+
+
+# How strongly spiders are pushed away from crowded cells when separation is enabled, in pixels per tick.
+SEPARATION_STRENGTH: float = 0.5
+# The radius, in cells, of the neighbourhood whose spiders count towards the crowding of a cell.
+SEPARATION_RADIUS: int = 2
+
+
+class PursuitField:
+    """
+    A grid over the arena holding, for every cell, the offset from its center to the player, the distance
+    between them and the direction of the player, both as a unit vector and as a direction code. The whole grid
+    is computed at once, and only when the player moved, so that however many spiders there are, each one
+    steers with a lookup of its cell instead of its own distance computation.
+    With separation, the grid also counts the spiders around each cell every tick, and pushes spiders
+    from the crowded cells towards the emptier ones.
+    """
+
+    def __init__(self, size: tuple[int, int] = (900, 450), cell_size: int = 10, separation: bool = False):
+
+        self.cell_size: int = cell_size
+        self.columns: int = -(-size[0] // cell_size)
+        self.rows: int = -(-size[1] // cell_size)
+        self.separation: bool = separation
+        self.player_position: tuple[int, int] | None = None
+
+        rows, columns = np.mgrid[0:self.rows, 0:self.columns]
+        self.cell_centers = np.stack((columns, rows), axis=-1).astype(np.float32) * cell_size + cell_size / 2
+
+        self.offsets = np.zeros((self.rows, self.columns, 2), dtype=np.float32)
+        self.distances = np.zeros((self.rows, self.columns), dtype=np.float32)
+        self.directions = np.zeros((self.rows, self.columns, 2), dtype=np.float32)
+        self.direction_codes = np.zeros(self.rows * self.columns, dtype=np.int8)
+        self.pushes = np.zeros((self.rows, self.columns, 2), dtype=np.float32)
+
+    def update(self, player_position: tuple[int, int], positions: np.ndarray | None = None) -> None:
+        """Points the grid towards the player, and spreads the spiders out if separation is enabled.
+
+        Args:
+            player_position (tuple[int, int]): The position of the player as a tuple of (x, y) coordinates.
+            positions (np.ndarray | None, optional): The (x, y) positions of every spider, needed for separation.
+        """
+
+        if player_position != self.player_position:
+
+            self.player_position = player_position
+            np.subtract(player_position, self.cell_centers, out=self.offsets)
+            np.hypot(self.offsets[..., 0], self.offsets[..., 1], out=self.distances)
+            np.divide(self.offsets, np.maximum(self.distances, 1)[..., None], out=self.directions)
+            self.direction_codes = toolkit.get_directions(self.offsets[..., 0].ravel(), self.offsets[..., 1].ravel())
+
+        if self.separation and positions is not None:
+            self.update_pushes(positions)
+
+    def update_pushes(self, positions: np.ndarray) -> None:
+        """Counts the spiders around each cell, then pushes spiders down the slope of that count.
+
+        Args:
+            positions (np.ndarray): The (x, y) positions of every spider.
+        """
+
+        counts = np.bincount(self.get_cells(positions), minlength=self.rows * self.columns)
+        counts = counts.reshape(self.rows, self.columns).astype(np.float32)
+
+        # Spiders are larger than cells, so the count of a cell includes the spiders of its neighbourhood.
+        radius: int = SEPARATION_RADIUS
+        padded = np.pad(counts, radius)
+        crowding = np.zeros_like(counts)
+
+        for row in range(2 * radius + 1):
+
+            for column in range(2 * radius + 1):
+
+                crowding += padded[row:row + self.rows, column:column + self.columns]
+
+        gradient_y, gradient_x = np.gradient(crowding)
+        self.pushes[..., 0] = -gradient_x * SEPARATION_STRENGTH
+        self.pushes[..., 1] = -gradient_y * SEPARATION_STRENGTH
+
+    def get_cells(self, positions: np.ndarray) -> np.ndarray:
+        """Returns the flat indexes of the cells holding some positions, positions outside the arena
+        belonging to the nearest cell.
+
+        Args:
+            positions (np.ndarray): The (x, y) positions.
+
+        Returns:
+            np.ndarray: One cell index per position.
+        """
+
+        columns = np.clip((positions[:, 0] // self.cell_size).astype(np.int32), 0, self.columns - 1)
+        rows = np.clip((positions[:, 1] // self.cell_size).astype(np.int32), 0, self.rows - 1)
+
+        return rows * self.columns + columns
+
+    def steer(self, positions: np.ndarray, velocities: np.ndarray, dead_zone: float) -> tuple:
+        """Steers many positions towards the player at once, pushing them apart if separation is enabled.
+
+        Args:
+            positions (np.ndarray): The (x, y) positions to steer.
+            velocities (np.ndarray): The speed of each position.
+            dead_zone (float): The radius around the player within which no movement is necessary.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: The movement of each position, the direction codes
+            of the player from their cells and whether each position moves towards the player, that is whether
+            it is outside of the dead zone.
+        """
+
+        cells = self.get_cells(positions)
+        moving = self.distances.reshape(-1)[cells] > dead_zone
+        movements = self.directions.reshape(-1, 2)[cells] * np.where(moving, velocities, 0)[:, None]
+
+        if self.separation:
+            movements += self.pushes.reshape(-1, 2)[cells]
+
+        return movements, self.direction_codes[cells], moving
+
+    def get_cell(self, position: tuple[int, int]) -> int:
+        """Single position version of get_cells."""
+
+        column: int = int(position[0]) // self.cell_size
+        row: int = int(position[1]) // self.cell_size
+
+        # Conditions are cheaper than calls to min() and max() for a single value.
+        column = 0 if column < 0 else self.columns - 1 if column >= self.columns else column
+        row = 0 if row < 0 else self.rows - 1 if row >= self.rows else row
+
+        return row * self.columns + column
+
+    def get_steering(self, position: tuple[int, int], velocity: float, dead_zone: float) -> tuple:
+        """Single position version of steer, without the separation push, see get_push. Looks up the movement
+        towards the player as toolkit.calculate_movement computes it, and the direction of the player
+        as toolkit.get_direction determines it.
+
+        Args:
+            position (tuple[int, int]): The position to move from.
+            velocity (float): The speed at which to move.
+            dead_zone (float): The radius around the player within which no movement is necessary.
+
+        Returns:
+            tuple[float, float, toolkit.Direction]: The horizontal and vertical movement, (0, 0) within the dead zone,
+            and the direction of the player.
+        """
+
+        # Single values are read with item(), much cheaper than indexing for a single cell.
+        cell: int = self.get_cell(position)
+        direction: toolkit.Direction = toolkit.DIRECTIONS[self.direction_codes.item(cell)]
+
+        if self.distances.item(cell) <= dead_zone:
+            return 0.0, 0.0, direction
+
+        return self.directions.item(cell * 2) * velocity, self.directions.item(cell * 2 + 1) * velocity, direction
+
+    def get_push(self, position: tuple[int, int]) -> tuple[float, float]:
+        """Looks up the separation push at a position.
+
+        Args:
+            position (tuple[int, int]): The position to push from.
+
+        Returns:
+            tuple[float, float]: The horizontal and vertical push, (0, 0) without separation.
+        """
+
+        if not self.separation:
+            return 0.0, 0.0
+
+        cell: int = self.get_cell(position)
+
+        return self.pushes.item(cell * 2), self.pushes.item(cell * 2 + 1)
@@ -0,0 +1,130 @@
+"""
+This module contains the quality governor, which watches how long frames take and lowers the quality
+of the visual effects, in tiers, while frames run over their budget, then raises it back once there is headroom.
+Tiers only change what is drawn, never anything the game logic reads, so that replays play the same at any tier.
+"""
+
+import logging
+from collections import deque
+
+from modules.simulation import TICK_DURATION
+
+
+logger = logging.getLogger(__name__)
+
+
+class QualityTier:
+    """
+    The settings of the visual effects at a level of quality.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            glow_radius_scale: float,
+            max_glows: int | None,
+            splash_frame_step: int,
+            footprint_step: int,
+            shadows: bool
+    ):
+
+        self.name: str = name
+        # Bullet glows: scale of their radius and maximum number per frame, None for all of them.
+        self.glow_radius_scale: float = glow_radius_scale
+        self.max_glows: int | None = max_glows
+        # Blood splashes only show every nth frame of their animation.
+        self.splash_frame_step: int = splash_frame_step
+        # Only every nth footprint of the player is stamped into the floor.
+        self.footprint_step: int = footprint_step
+        self.shadows: bool = shadows
+
+
+# From the highest quality to the lowest.
+QUALITY_TIERS: tuple[QualityTier, ...] = (
+    QualityTier(
+        name="high", glow_radius_scale=1, max_glows=None, splash_frame_step=1, footprint_step=1, shadows=True
+    ),
+    QualityTier(
+        name="medium", glow_radius_scale=0.8, max_glows=24, splash_frame_step=2, footprint_step=2, shadows=True
+    ),
+    QualityTier(
+        name="low", glow_radius_scale=0.6, max_glows=8, splash_frame_step=3, footprint_step=3, shadows=False
+    )
+)
+
+
+class QualityGovernor:
+    """
+    Keeps the rolling work time of the frames, the time spent rendering and simulating without the time spent
+    waiting for the next frame. When its average goes past the budget of a tick, the quality steps down a tier,
+    and when it stays well below, it steps back up. After each change, a full window of frames is measured
+    again before the next one, so that the quality doesn't flicker between tiers.
+    """
+
+    def __init__(
+            self,
+            tiers: tuple[QualityTier, ...] = QUALITY_TIERS,
+            budget: float = TICK_DURATION,
+            headroom: float = 0.6,
+            window: int = 60
+    ):
+
+        self.tiers: tuple[QualityTier, ...] = tiers
+        self.budget: float = budget
+        self.headroom: float = headroom
+        self.frame_times: deque = deque(maxlen=window)
+        self.tier_index: int = 0
+
+    @property
+    def tier(self) -> QualityTier:
+
+        return self.tiers[self.tier_index]
+
+    def reset(self) -> None:
+        """Goes back to the highest quality, forgetting the frames measured so far, such as slow loading frames."""
+
+        self.frame_times.clear()
+        self.tier_index = 0
+
+    def set_tier(self, tier_index: int, average: float) -> None:
+        """Changes the quality tier and starts a new measurement window.
+
+        Args:
+            tier_index (int): The index of the new tier in the tiers.
+            average (float): The average work time of the frames that led to the change, in milliseconds.
+        """
+
+        previous: QualityTier = self.tier
+        self.tier_index = tier_index
+        self.frame_times.clear()
+        logger.info("Quality: %s -> %s (average frame work %.1f ms)", previous.name, self.tier.name, average)
+
+    def update(self, frame_time: float) -> bool:
+        """Records the work time of a frame, and changes the tier once a full window of frames calls for it.
+
+        Args:
+            frame_time (float): The time spent on the frame in milliseconds, waiting for the next frame excluded.
+
+        Returns:
+            bool: True if the tier changed.
+        """
+
+        self.frame_times.append(frame_time)
+
+        if len(self.frame_times) < self.frame_times.maxlen:
+            return False
+
+        average: float = sum(self.frame_times) / len(self.frame_times)
+
+        if average > self.budget and self.tier_index < len(self.tiers) - 1:
+            self.set_tier(self.tier_index + 1, average)
+            return True
+
+        if average < self.budget * self.headroom and self.tier_index > 0:
+            self.set_tier(self.tier_index - 1, average)
+            return True
+
+        return False
+
+
+quality_governor = QualityGovernor()
@@ -0,0 +1,169 @@
+"""
+This module contains the replays, which store the seed of a game along with its input at every tick
+in a compact binary format, so that the exact same game can be played back, at real speed or headless.
+"""
+
+import pygame
+import struct
+from pathlib import Path
+
+from modules.simulation import Controls, KeysState
+
+
+MAGIC: bytes = b"SSRP"
+VERSION: int = 3
+
+# Magic number, version, seed, flags and number of ticks, followed by the input of each tick.
+HEADER = struct.Struct("<4sBIBI")
+# Mouse position and a byte holding the state of the mouse buttons and of the SPACE key.
+TICK = struct.Struct("<hhB")
+
+FLAG_SWARM: int = 1
+FLAG_PURSUIT_FIELD: int = 2
+FLAG_SEPARATION: int = 4
+BUTTON_BITS: tuple = (1, 2, 4)
+SPACE_BIT: int = 8
+
+
+class Replay:
+    """
+    The input of a game, recorded tick by tick.
+    """
+
+    def __init__(
+            self,
+            seed: int,
+            use_swarm: bool = False,
+            ticks: bytes = b"",
+            use_pursuit_field: bool = False,
+            separation: bool = False
+    ):
+
+        self.seed: int = seed
+        self.use_swarm: bool = use_swarm
+        self.use_pursuit_field: bool = use_pursuit_field
+        self.separation: bool = separation
+        self.ticks: bytearray = bytearray(ticks)
+
+    def __len__(self) -> int:
+
+        return len(self.ticks) // TICK.size
+
+    def append(self, mouse_position: tuple[int, int], mouse_buttons: tuple[bool, bool, bool], space: bool) -> None:
+
+        state: int = SPACE_BIT if space else 0
+
+        for bit, pressed in zip(BUTTON_BITS, mouse_buttons):
+
+            state |= bit if pressed else 0
+
+        self.ticks += TICK.pack(int(mouse_position[0]), int(mouse_position[1]), state)
+
+    def get(self, index: int) -> tuple[tuple[int, int], tuple[bool, bool, bool], bool]:
+        """Returns the input of a tick.
+
+        Args:
+            index (int): The index of the tick, starting from 0.
+
+        Returns:
+            tuple: The mouse position, the state of the mouse buttons and whether SPACE is pressed.
+        """
+
+        x, y, state = TICK.unpack_from(self.ticks, index * TICK.size)
+        mouse_buttons: tuple = tuple(bool(state & bit) for bit in BUTTON_BITS)
+
+        return (x, y), mouse_buttons, bool(state & SPACE_BIT)
+
+    def save(self, file: Path) -> None:
+
+        flags: int = (
+            (FLAG_SWARM if self.use_swarm else 0)
+            | (FLAG_PURSUIT_FIELD if self.use_pursuit_field else 0)
+            | (FLAG_SEPARATION if self.separation else 0)
+        )
+        Path(file).write_bytes(HEADER.pack(MAGIC, VERSION, self.seed, flags, len(self)) + self.ticks)
+
+    @classmethod
+    def load(cls, file: Path) -> "Replay":
+
+        data: bytes = Path(file).read_bytes()
+        magic, version, seed, flags, ticks = HEADER.unpack_from(data)
+
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{file} is not a replay of this version of the game")
+
+        return cls(
+            seed=seed,
+            use_swarm=bool(flags & FLAG_SWARM),
+            ticks=data[HEADER.size:HEADER.size + ticks * TICK.size],
+            use_pursuit_field=bool(flags & FLAG_PURSUIT_FIELD),
+            separation=bool(flags & FLAG_SEPARATION)
+        )
+
+
+class ReplayRecorder(Controls):
+    """
+    Records the input of other controls tick by tick. The input is read once per tick, so the game
+    sees exactly what is recorded even if the mouse moves in the middle of a tick.
+    """
+
+    def __init__(self, controls: Controls, replay: Replay):
+
+        self.controls: Controls = controls
+        self.replay: Replay = replay
+        self.mouse_position: tuple[int, int] = (0, 0)
+        self.mouse_buttons: tuple[bool, bool, bool] = (False, False, False)
+        self.pressed_keys: set = set()
+
+    @property
+    def finished(self) -> bool:
+        """The recording ends with the controls it records, such as a replay played back."""
+
+        return self.controls.finished
+
+    def update(self, tick: int) -> None:
+
+        self.controls.update(tick)
+
+        # Nothing is left to record once the recorded controls ran out of input.
+        if self.finished:
+            return
+
+        self.mouse_position = self.controls.get_mouse_pos()
+        self.mouse_buttons = tuple(self.controls.get_mouse_pressed()[:3])
+        self.pressed_keys = {pygame.K_SPACE} if self.controls.get_keys_pressed()[pygame.K_SPACE] else set()
+        self.replay.append(self.mouse_position, self.mouse_buttons, pygame.K_SPACE in self.pressed_keys)
+
+    def get_keys_pressed(self) -> KeysState:
+
+        return KeysState(self.pressed_keys)
+
+    def get_mouse_pos(self) -> tuple[int, int]:
+
+        return self.mouse_position
+
+    def get_mouse_pressed(self) -> tuple[bool, bool, bool]:
+
+        return self.mouse_buttons
+
+
+class ReplayControls(ReplayRecorder):
+    """
+    Plays back the input of a replay, then reports being finished once every tick was played.
+    """
+
+    # Set by the playback itself, rather than passed on from the controls as when recording.
+    finished: bool = False
+
+    def __init__(self, replay: Replay):
+
+        super().__init__(controls=Controls(), replay=replay)
+
+    def update(self, tick: int) -> None:
+
+        if tick > len(self.replay):
+            self.finished = True
+            return
+
+        self.mouse_position, self.mouse_buttons, space = self.replay.get(tick - 1)
+        self.pressed_keys = {pygame.K_SPACE} if space else set()
@@ -0,0 +1,192 @@
+"""
+This module abstracts the sources of input, time and randomness used by the game, so that it can
+either be played live or simulated headless with scripted input, a fixed step and a seeded random generator.
+"""
+
+import pygame
+from math import cos, sin
+from random import Random, randrange
+from typing import Callable
+
+from modules.toolkit import Direction
+
+
+TICKS_PER_SECOND: int = 60
+TICK_DURATION: float = 1000 / TICKS_PER_SECOND
+
+# The most ticks simulated in a row before a frame is rendered. When the game falls further behind,
+# the time it can't catch up with is dropped, slowing the game down instead of stalling it.
+MAX_CATCH_UP_TICKS: int = 5
+
+
+class KeysState:
+    """
+    Mimics the sequence returned by pygame.key.get_pressed() for a set of pressed keys.
+    """
+
+    def __init__(self, pressed_keys: set):
+
+        self.pressed_keys: set = pressed_keys
+
+    def __getitem__(self, key: int) -> bool:
+
+        return key in self.pressed_keys
+
+
+class InputState:
+    """
+    The input of a tick, read from the controls once as the tick starts and handed to whatever needs it,
+    along with the facing and aim directions of the player, derived from it once per tick by the game.
+    """
+
+    def __init__(
+            self,
+            mouse_position: tuple[int, int] = (0, 0),
+            mouse_buttons: tuple[bool, bool, bool] = (False, False, False),
+            keys=None
+    ):
+
+        self.mouse_position: tuple[int, int] = mouse_position
+        self.mouse_buttons: tuple[bool, bool, bool] = mouse_buttons
+        self.keys = keys if keys is not None else KeysState(set())
+        self.facing: Direction = Direction.NONE
+        self.aim: Direction = Direction.NONE
+
+
+class Controls:
+    """
+    Reads the live state of the mouse and the keyboard.
+    """
+
+    # Whether the controls ran out of input, as a replay does once played back.
+    finished: bool = False
+
+    def update(self, tick: int) -> None:
+
+        ...
+
+    def get_keys_pressed(self):
+
+        return pygame.key.get_pressed()
+
+    def get_mouse_pos(self) -> tuple[int, int]:
+
+        return pygame.mouse.get_pos()
+
+    def get_mouse_pressed(self) -> tuple[bool, bool, bool]:
+
+        return pygame.mouse.get_pressed()
+
+    def get_input_state(self) -> InputState:
+
+        return InputState(
+            mouse_position=tuple(self.get_mouse_pos()),
+            mouse_buttons=tuple(self.get_mouse_pressed()[:3]),
+            keys=self.get_keys_pressed()
+        )
+
+
+def default_script(tick: int, controls: "ScriptedControls") -> None:
+    """Moves the mouse around the middle of the arena and keeps shooting,
+    sprinting from time to time.
+
+    Args:
+        tick (int): The current simulation tick.
+        controls (ScriptedControls): The controls to update.
+    """
+
+    controls.mouse_position = (int(450 + 300 * cos(tick / 120)), int(225 + 150 * sin(tick / 90)))
+    controls.mouse_buttons = (False, False, tick % 600 < 120)
+    controls.pressed_keys = {pygame.K_SPACE}
+
+
+class ScriptedControls(Controls):
+    """
+    Replaces the mouse and the keyboard by a script, called once per tick to update the input.
+    """
+
+    def __init__(self, script: Callable[[int, "ScriptedControls"], None] = default_script):
+
+        self.script: Callable[[int, ScriptedControls], None] = script
+        self.mouse_position: tuple[int, int] = (450, 225)
+        self.mouse_buttons: tuple[bool, bool, bool] = (False, False, False)
+        self.pressed_keys: set = set()
+
+    def update(self, tick: int) -> None:
+
+        self.script(tick, self)
+
+    def get_keys_pressed(self) -> KeysState:
+
+        return KeysState(self.pressed_keys)
+
+    def get_mouse_pos(self) -> tuple[int, int]:
+
+        return self.mouse_position
+
+    def get_mouse_pressed(self) -> tuple[bool, bool, bool]:
+
+        return self.mouse_buttons
+
+
+class Simulation:
+    """
+    Holds the tick counter of the game along with its controls and its random number generator.
+    In fixed step mode, time is derived from the tick counter instead of the wall clock.
+    Every random decision of the gameplay goes through the generator, so a seed and the input
+    of every tick are enough to play a game again. Purely visual randomness, drawn once per rendered
+    frame rather than once per tick, goes through a generator of its own so that it can't shift the gameplay.
+    """
+
+    def __init__(self):
+
+        self.controls: Controls = Controls()
+        self.fixed_step: bool = False
+        self.tick: int = 0
+        self.input: InputState = InputState()
+        self.random: Random = Random()
+        self.render_random: Random = Random()
+        self.seed: int = 0
+        self.reseed()
+
+    def advance(self, input_state: InputState | None = None) -> None:
+        """Starts a new tick and takes the snapshot of its input.
+
+        Args:
+            input_state (InputState | None, optional): The input of the tick, read from the controls if None.
+        """
+
+        self.tick += 1
+        self.controls.update(self.tick)
+        self.input = input_state if input_state is not None else self.controls.get_input_state()
+
+    def get_ticks(self) -> int:
+        """Returns the number of milliseconds elapsed since the start of the game.
+
+        Returns:
+            int: The simulated time in fixed step mode, the wall clock time otherwise.
+        """
+
+        if self.fixed_step:
+            return self.tick * 1000 // TICKS_PER_SECOND
+
+        return pygame.time.get_ticks()
+
+    def reseed(self, seed: int | None = None) -> None:
+        """Seeds the random number generator.
+
+        Args:
+            seed (int | None, optional): The seed, a new random one if None.
+        """
+
+        self.seed = randrange(2 ** 32) if seed is None else seed
+        self.random.seed(self.seed)
+        self.render_random.seed(self.seed)
+
+    def set_fixed_step(self, controls: Controls) -> None:
+
+        self.controls = controls
+        self.fixed_step = True
+
+
+simulation = Simulation()
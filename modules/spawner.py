@@ -0,0 +1,167 @@
+"""
+This module contains the spawn scheduler, which decides when and where spiders appear: adults arrive in waves
+of increasing pace, every spawn goes through a queue spreading bursts over several ticks, and nothing spawns
+past a budget of live spiders, so that the number of entities, and the frame time with it, stay bounded.
+"""
+
+import pygame
+from collections import deque
+
+from modules.simulation import simulation
+
+
+class Wave:
+    """
+    A stage of the game: from its start on, a number of adult spiders are due every period.
+    """
+
+    def __init__(self, start: int, period: int, count: int = 1):
+
+        self.start: int = start
+        self.period: int = period
+        self.count: int = count
+
+
+# Times are in milliseconds of game time, counted from the start of the game.
+WAVES: tuple[Wave, ...] = (
+    Wave(start=0, period=350),
+    Wave(start=60000, period=300),
+    Wave(start=120000, period=250),
+    Wave(start=180000, period=200)
+)
+
+# Adults spawn out of sight, in the area around the screen left once the area close to it is removed.
+SPAWN_AREA = pygame.Rect(-100, -100, 1101, 651)
+EXCLUDED_AREA = pygame.Rect(-32, -32, 1015, 615)
+
+
+def get_spawn_bands(area: pygame.Rect, excluded: pygame.Rect) -> list[pygame.Rect]:
+    """Splits an area minus an excluded one into rectangular bands.
+
+    Args:
+        area (pygame.Rect): The whole area.
+        excluded (pygame.Rect): The area to remove from it.
+
+    Returns:
+        list[pygame.Rect]: The bands, above, below, left and right of the excluded area, empty ones left out.
+    """
+
+    top: int = min(max(excluded.top, area.top), area.bottom)
+    bottom: int = min(max(excluded.bottom, area.top), area.bottom)
+    left: int = min(max(excluded.left, area.left), area.right)
+    right: int = min(max(excluded.right, area.left), area.right)
+
+    bands: list[pygame.Rect] = [
+        pygame.Rect(area.left, area.top, area.width, top - area.top),
+        pygame.Rect(area.left, bottom, area.width, area.bottom - bottom),
+        pygame.Rect(area.left, top, left - area.left, bottom - top),
+        pygame.Rect(right, top, area.right - right, bottom - top)
+    ]
+
+    return [band for band in bands if band.width > 0 and band.height > 0]
+
+
+class SpawnScheduler:
+    """
+    Queues the spiders to spawn, adults as their waves require and eggs as they are laid, then releases
+    them a few per tick, as long as the number of live spiders is below the budget. Requests waiting
+    in a full queue are dropped, so that a long run can't build up an endless backlog.
+    """
+
+    def __init__(
+            self,
+            waves: tuple[Wave, ...] = WAVES,
+            budget: int = 150,
+            spawns_per_tick: int = 2,
+            queue_size: int = 32
+    ):
+
+        self.waves: tuple[Wave, ...] = waves
+        self.budget: int = budget
+        self.spawns_per_tick: int = spawns_per_tick
+        self.queue: deque = deque(maxlen=queue_size)
+        self.start_time: int = 0
+        self.next_wave_time: int = 0
+        self.dropped: int = 0
+
+        self.spawn_bands: list[pygame.Rect] = get_spawn_bands(SPAWN_AREA, EXCLUDED_AREA)
+        self.spawn_weights: list[int] = [band.width * band.height for band in self.spawn_bands]
+
+    def reset(self, now: int) -> None:
+        """Starts the waves over from the current time and empties the queue.
+
+        Args:
+            now (int): The current time in milliseconds.
+        """
+
+        self.start_time = now
+        self.next_wave_time = now
+        self.queue.clear()
+        self.dropped = 0
+
+    @property
+    def wave(self) -> Wave:
+        """The current wave, the last one to have started."""
+
+        elapsed: int = self.next_wave_time - self.start_time
+
+        return next(wave for wave in reversed(self.waves) if wave.start <= elapsed)
+
+    def get_spawn_position(self) -> tuple[int, int]:
+        """Picks a position out of sight, uniformly over the spawn area, in a single draw per coordinate
+        instead of drawing positions until one is out of sight.
+
+        Returns:
+            tuple[int, int]: The position of the top left corner of the spider.
+        """
+
+        band: pygame.Rect = simulation.random.choices(self.spawn_bands, weights=self.spawn_weights)[0]
+
+        return simulation.random.randrange(band.left, band.right), simulation.random.randrange(band.top, band.bottom)
+
+    def request(self, species: str, position: tuple[int, int] | None = None) -> None:
+        """Queues a spider to spawn.
+
+        Args:
+            species (str): The species of the spider, "adult" or "baby".
+            position (tuple[int, int] | None, optional): The position of its top left corner, out of sight if None.
+        """
+
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+            return
+
+        self.queue.append((species, position))
+
+    def update(self, now: int, live: int) -> list[tuple[str, tuple[int, int]]]:
+        """Queues the adults due since the previous tick, then releases the spiders to spawn during this tick.
+
+        Args:
+            now (int): The current time in milliseconds.
+            live (int): The number of live spiders.
+
+        Returns:
+            list[tuple[str, tuple[int, int]]]: The species and the position of each spider to spawn.
+        """
+
+        while self.next_wave_time <= now:
+
+            wave: Wave = self.wave
+
+            for _ in range(wave.count):
+
+                self.request("adult")
+
+            self.next_wave_time += wave.period
+
+        spawns: list[tuple[str, tuple[int, int]]] = []
+
+        while self.queue and len(spawns) < self.spawns_per_tick and live + len(spawns) < self.budget:
+
+            species, position = self.queue.popleft()
+            spawns.append((species, position if position is not None else self.get_spawn_position()))
+
+        return spawns
+
+
+spawn_scheduler = SpawnScheduler()
@@ -3,32 +3,42 @@ This module contains everything related to spiders.
 """
 
 import pygame
-from random import randint, uniform, choice
 from pathlib import Path
 
 from modules import constants
 from modules import toolkit
+from modules.decals import decal_layer
+from modules.pursuit import PursuitField
+from modules.quality import quality_governor
+from modules.simulation import simulation
+from modules.spawner import spawn_scheduler
 
 
 spider_sprites = pygame.sprite.Group()
 spider_blood_effects = pygame.sprite.Group()
 
+# The collision broadphase of the spiders, built once per tick after they moved and shared by every collision test.
+spider_hash = toolkit.SpatialHash()
+
+# Pre-rotated animation frames, indexed by (species, animation, frame index, direction).
+# Each entry holds the rotated surface, its rectangle, used to recenter the spider, and its collision mask.
+rotated_frames: dict = {}
+
 
 class Spider(pygame.sprite.Sprite):
 
+    species: str = ""
+
     def __init__(self):
         super().__init__()
 
         self.game_surface: pygame.Surface = pygame.display.get_surface()
 
         self.death_sounds: list = [
-            pygame.mixer.Sound(Path(constants.AUDIO_DIR / "spiders", f"spider_death_0{i}.wav")) for i in range(1, 6)
+            toolkit.asset_registry.get_sound(Path(constants.AUDIO_DIR / "spiders", f"spider_death_0{i}.wav"), 0.3)
+            for i in range(1, 6)
         ]
 
-        for death_sound in self.death_sounds:
-
-            death_sound.set_volume(0.3)
-
         self.velocity: int = 0
         self.spawn_position: tuple[int, int]
         self.direction: toolkit.Direction = toolkit.Direction.NONE
@@ -36,51 +46,53 @@ class Spider(pygame.sprite.Sprite):
         self.idle_frame_index: int = 0
         self.attacking_frame_index: int = 0
         self.animation_frame_delay: int = 0
+        self.pooled: bool = False
 
         ##############################
         # Assets.
         ##############################
 
-        self.assets: dict = toolkit.load_images(folder=Path(constants.GRAPHICS_DIR / "spiders"), alpha=True)
+        self.assets: dict = toolkit.asset_registry.get_folder(
+            folder=Path(constants.GRAPHICS_DIR / "spiders"),
+            alpha=True
+        )
 
-        self.adult_idle_sprites: list[pygame.Surface] = toolkit.SpritesLoader(
+        self.adult_idle_sprites: list[pygame.Surface] = toolkit.asset_registry.get_sprites(
             sprites_image=self.assets.get("idle_green_spiders"),
             sprites_size=64,
             sprites_number=7
-        ).sprite_surfaces()
+        )
 
-        self.baby_idle_sprites: list[pygame.Surface] = toolkit.SpritesLoader(
+        self.baby_idle_sprites: list[pygame.Surface] = toolkit.asset_registry.get_sprites(
             sprites_image=self.assets.get("idle_red_spiders"),
             sprites_size=64,
-            sprites_number=7
-        ).sprite_surfaces(0.7)
+            sprites_number=7,
+            scale_factor=0.7
+        )
 
-        self.adult_attacking_sprites: list[pygame.Surface] = toolkit.SpritesLoader(
+        self.adult_attacking_sprites: list[pygame.Surface] = toolkit.asset_registry.get_sprites(
             sprites_image=self.assets.get("attack_green_spiders"),
             sprites_size=64,
             sprites_number=3
-        ).sprite_surfaces()
+        )
 
-        self.baby_attacking_sprites: list[pygame.Surface] = toolkit.SpritesLoader(
+        self.baby_attacking_sprites: list[pygame.Surface] = toolkit.asset_registry.get_sprites(
             sprites_image=self.assets.get("attack_red_spiders"),
             sprites_size=64,
-            sprites_number=3
-        ).sprite_surfaces(0.7)
+            sprites_number=3,
+            scale_factor=0.7
+        )
 
         ##############################
 
         self.image: pygame.Surface
         self.rect: pygame.Rect
+        self.mask: pygame.mask.Mask
 
     def attack_animation(self) -> None:
 
         ...
 
-    def draw_shadow(self) -> None:
-
-        spider_shadow: pygame.Surface = toolkit.get_shadow_surface(self.image)
-        self.game_surface.blit(spider_shadow, (self.rect.x - 4, self.rect.y + 4))
-
     def get_direction(self, player_position: tuple[int, int]) -> toolkit.Direction:
         """Determines the direction in which a spider moves.
 
@@ -99,28 +111,93 @@ class Spider(pygame.sprite.Sprite):
 
         ...
 
-    def kill(self):
+    @classmethod
+    def build_rotated_frames(cls, sprites: list[pygame.Surface], animation: str) -> None:
+        """Rotates every frame of an animation in every direction and stores the results in the rotated frames table,
+        taking the rotated frames from the sprite atlas when they were baked into it.
+        The drop shadows and collision masks of the rotated frames are baked at the same time.
 
-        choice(self.death_sounds).play()
-        spider_blood_effects.add(SpiderBloodSplat(position=self.rect.center))   # type: ignore
-        spider_blood_effects.add(SpiderBloodSplash(position=self.rect.center))  # type: ignore
+        Args:
+            sprites (list[pygame.Surface]): The frames of the animation.
+            animation (str): The name of the animation.
+        """
 
-        super().kill()
+        for frame_index, frame in enumerate(sprites):
 
-    def update(self, player_position: tuple[int, int]) -> None:
+            for direction in toolkit.Direction:
 
-        mov_x, mov_y = toolkit.calculate_movement(
-            destination=player_position,
-            rect_xy=(int(self.rect.centerx), int(self.rect.centery)),
-            dead_zone=10,
-            velocity=self.velocity
-        )
+                image: pygame.Surface | None = toolkit.asset_registry.get_atlas_frame(
+                    f"rotated:{cls.species}/{animation}/{frame_index}/{direction.name}"
+                )
+
+                if image is None:
+                    image = pygame.transform.rotate(frame, direction.value)
 
-        self.rect.move_ip(mov_x, mov_y)
+                mask: pygame.mask.Mask = toolkit.asset_registry.get_mask(image)
+                rotated_frames[(cls.species, animation, frame_index, direction)] = image, image.get_rect(), mask
+                toolkit.asset_registry.bake_shadows([image])
+
+    def set_rotated_frame(self, sprites: list[pygame.Surface], animation: str, frame_index: int) -> None:
+        """Displays an animation frame rotated toward the current direction.
+
+        Args:
+            sprites (list[pygame.Surface]): The frames of the animation.
+            animation (str): The name of the animation.
+            frame_index (int): The index of the frame to display.
+        """
+
+        key: tuple = (self.species, animation, frame_index, self.direction)
+
+        if key not in rotated_frames:
+            self.build_rotated_frames(sprites=sprites, animation=animation)
+
+        self.image, image_rect, self.mask = rotated_frames[key]
+
+        # It's important to recenter the rectangle because rotation alters the image's dimensions.
+        center: tuple[int, int] = self.rect.center
+        self.rect.size = image_rect.size
+        self.rect.center = center
+
+    def kill(self):
+
+        simulation.random.choice(self.death_sounds).play()
+        decal_layer.add(splat_pool.acquire(position=self.rect.center))
+        spider_blood_effects.add(splash_pool.acquire(position=self.rect.center))
+
+        super().kill()
+        toolkit.release(self)
+
+    def reset(self) -> None:
+        """Resets the state of a spider so that it can be recycled by an object pool."""
+
+        self.direction = toolkit.Direction.NONE
+        self.attacking = False
+        self.idle_frame_index = 0
+        self.attacking_frame_index = 0
+        self.animation_frame_delay = 0
+
+    def update(self, player_position: tuple[int, int], pursuit_field: PursuitField | None = None) -> None:
+
+        # With a pursuit field, the way to the player and its direction are looked up instead of computed.
+        if pursuit_field is not None:
+            mov_x, mov_y, self.direction = pursuit_field.get_steering(self.rect.center, self.velocity, dead_zone=10)
+            push_x, push_y = pursuit_field.get_push(self.rect.center)
+        else:
+            mov_x, mov_y = toolkit.calculate_movement(
+                destination=player_position,
+                rect_xy=(int(self.rect.centerx), int(self.rect.centery)),
+                dead_zone=10,
+                velocity=self.velocity
+            )
+            push_x, push_y = 0.0, 0.0
+
+        self.rect.move_ip(mov_x + push_x, mov_y + push_y)
 
         self.animation_frame_delay -= 1
         self.attacking = True if (mov_x, mov_y) == (0, 0) else False
-        self.direction = self.get_direction(player_position=player_position)
+
+        if pursuit_field is None:
+            self.direction = self.get_direction(player_position=player_position)
 
         if self.animation_frame_delay <= 0 and not self.attacking:
 
@@ -130,19 +207,24 @@ class Spider(pygame.sprite.Sprite):
 
             self.attack_animation()
 
-        # It's important to recenter the rectangle because rotation alters the image's dimensions.
-        self.rect = self.image.get_rect(center=self.rect.center)
-
 
 class AdultSpider(Spider):
 
-    def __init__(self):
+    species = "adult"
+
+    def __init__(self, spawn_position: tuple[int, int] | None = None):
         super().__init__()
 
         self.velocity = 2
-        self.spawn_position = self.randomize_spawn_location()
+        self.reset(spawn_position=spawn_position)
+
+    def reset(self, spawn_position: tuple[int, int] | None = None) -> None:
+
+        super().reset()
+        self.spawn_position = spawn_position if spawn_position is not None else spawn_scheduler.get_spawn_position()
 
         self.image = self.adult_idle_sprites[self.idle_frame_index]
+        self.mask = toolkit.asset_registry.get_mask(self.image)
         self.rect = pygame.rect.Rect(*self.spawn_position, 32, 32)
 
     def attack_animation(self) -> None:
@@ -150,53 +232,46 @@ class AdultSpider(Spider):
         self.animation_frame_delay = 12
         self.attacking_frame_index = (self.attacking_frame_index + 1) % len(self.adult_attacking_sprites)
 
-        image = pygame.transform.rotate(self.adult_attacking_sprites[self.attacking_frame_index], self.direction.value)
-        self.image = image
+        self.set_rotated_frame(self.adult_attacking_sprites, "attack", self.attacking_frame_index)
 
     def idle_animation(self) -> None:
 
         self.animation_frame_delay = 6
         self.idle_frame_index = (self.idle_frame_index + 1) % len(self.adult_idle_sprites)
 
-        image = pygame.transform.rotate(self.adult_idle_sprites[self.idle_frame_index], self.direction.value)
-        self.image = image
+        self.set_rotated_frame(self.adult_idle_sprites, "idle", self.idle_frame_index)
 
     def kill(self) -> None:
 
-        if not randint(a=0, b=2):  # 1 in 3 chance to lay eggs.
+        if not simulation.random.randint(a=0, b=2):  # 1 in 3 chance to lay eggs.
             self.spawn_babies()
 
         super().kill()
 
-    def randomize_spawn_location(self) -> tuple[int, int]:
-        """Generate a random spawn location for a spider.
-
-        Returns:
-            tuple[int, int]: A tuple containing the randomly generated x and y coordinates.
-        """
-
-        random_x_spawn: int = randint(-100, 1000)
-        random_y_spawn: int = randint(-100, 550)
-
-        if not (-32 <= random_x_spawn <= 982) or not (-32 <= random_y_spawn <= 582):
-            return random_x_spawn, random_y_spawn
-        return self.randomize_spawn_location()
-
     def spawn_babies(self) -> None:
 
-        for i in range(randint(a=1, b=5)):
-            spider_sprites.add(BabySpider((self.rect.centerx - 20 * i, self.rect.centery - 20 * i)))  # type: ignore
+        # The babies hatch through the spawn scheduler, which spreads them over the next ticks.
+        for i in range(simulation.random.randint(a=1, b=5)):
+            spawn_scheduler.request("baby", (self.rect.centerx - 20 * i, self.rect.centery - 20 * i))
 
 
 class BabySpider(Spider):
 
+    species = "baby"
+
     def __init__(self, spawn_position: tuple[int, int]):
         super().__init__()
 
         self.velocity = 3
+        self.reset(spawn_position=spawn_position)
+
+    def reset(self, spawn_position: tuple[int, int]) -> None:
+
+        super().reset()
         self.spawn_position = spawn_position
 
         self.image = self.baby_idle_sprites[self.idle_frame_index]
+        self.mask = toolkit.asset_registry.get_mask(self.image)
         self.rect = pygame.rect.Rect(*self.spawn_position, 24, 24)
 
     def attack_animation(self) -> None:
@@ -204,16 +279,14 @@ class BabySpider(Spider):
         self.animation_frame_delay = 6
         self.attacking_frame_index = (self.attacking_frame_index + 1) % len(self.baby_attacking_sprites)
 
-        image = pygame.transform.rotate(self.baby_attacking_sprites[self.attacking_frame_index], self.direction.value)
-        self.image = image
+        self.set_rotated_frame(self.baby_attacking_sprites, "attack", self.attacking_frame_index)
 
     def idle_animation(self) -> None:
 
         self.animation_frame_delay = 3
         self.idle_frame_index = (self.idle_frame_index + 1) % len(self.baby_idle_sprites)
 
-        image = pygame.transform.rotate(self.baby_idle_sprites[self.idle_frame_index], self.direction.value)
-        self.image = image
+        self.set_rotated_frame(self.baby_idle_sprites, "idle", self.idle_frame_index)
 
 
 class SpiderBloodSplash(pygame.sprite.Sprite):
@@ -226,33 +299,48 @@ class SpiderBloodSplash(pygame.sprite.Sprite):
     def __init__(self, position: tuple[int, int]):
         super().__init__()
 
-        adjusted_position: tuple[int, int] = position[0] - 90, position[1] - 90
-
-        assets: dict = toolkit.load_images(
+        assets: dict = toolkit.asset_registry.get_folder(
             folder=Path(constants.GRAPHICS_DIR / "spiders", "blood"),
             alpha=True
         )
 
         self.animation_frames: list[pygame.Surface] = list(assets.values())
-        self.animation_frame_index: int = 0
-        self.animation_frame_delay: int = 0
+        self.pooled: bool = False
+        self.reset(position=position)
 
-        self.image = self.animation_frames[self.animation_frame_index]
-        self.rect = pygame.Rect(*adjusted_position, 32, 32)
+    def kill(self) -> None:
+
+        super().kill()
+        toolkit.release(self)
 
     def play_animation(self) -> None:
 
         self.animation_frame_delay = 1
         self.animation_frame_index = (self.animation_frame_index + 1) % len(self.animation_frames)
 
-        frame = self.animation_frames[self.animation_frame_index]
-        scaled_frame = pygame.transform.scale2x(frame)
+        # At lower quality tiers, the image is only changed every few frames. The animation keeps its length,
+        # which decides how long the splash stays on the floor for the player to step in.
+        if not self.animation_frame_index % quality_governor.tier.splash_frame_step:
 
-        self.image = scaled_frame
+            frame = self.animation_frames[self.animation_frame_index]
+            scaled_frame = toolkit.asset_registry.get_scaled2x(frame)
+
+            self.image = scaled_frame
 
         if self.animation_frame_index >= 28:
             self.kill()
 
+    def reset(self, position: tuple[int, int]) -> None:
+        """Restarts the animation at a new position, so that the splash can be recycled by an object pool."""
+
+        adjusted_position: tuple[int, int] = position[0] - 90, position[1] - 90
+
+        self.animation_frame_index: int = 0
+        self.animation_frame_delay: int = 0
+
+        self.image = self.animation_frames[self.animation_frame_index]
+        self.rect = pygame.Rect(*adjusted_position, 32, 32)
+
     def update(self) -> None:
 
         self.animation_frame_delay -= 1
@@ -265,30 +353,41 @@ class SpiderBloodSplash(pygame.sprite.Sprite):
 class SpiderBloodSplat(pygame.sprite.Sprite):
     """
     A class representing blood splats left by spiders.
+    Splats are baked into the floor by the decal layer, which fades them, rather than drawn as sprites.
     """
 
+    decal_kind: str = "splat"
+
     def __init__(self, position: tuple[int, int]):
         super().__init__()
 
-        adjusted_position: tuple[int, int] = position[0] - 30, position[1] - 30
-
         ##############################
         # Assets.
         ##############################
 
         blood_splats_file: Path = Path(constants.GRAPHICS_DIR / "spiders", "blood_splats.png")
-        blood_splats: pygame.Surface = pygame.image.load(blood_splats_file).convert_alpha()
+        blood_splats: pygame.Surface = toolkit.asset_registry.get_image(blood_splats_file, alpha=True)
 
-        self.blood_splats_list: list[pygame.Surface] = toolkit.SpritesLoader(
+        self.blood_splats_list: list[pygame.Surface] = toolkit.asset_registry.get_sprites(
             sprites_image=blood_splats,
             sprites_size=256,
             sprites_number=5
-        ).sprite_surfaces()
+        )
 
         ##############################
 
-        self.opacity: int = 100
-        self.animation_frame_delay: int = 100
+        self.pooled: bool = False
+        self.reset(position=position)
+
+    def kill(self) -> None:
+
+        super().kill()
+        toolkit.release(self)
+
+    def reset(self, position: tuple[int, int]) -> None:
+        """Draws a new splat at a new position, so that the splat can be recycled by an object pool."""
+
+        adjusted_position: tuple[int, int] = position[0] - 30, position[1] - 30
 
         self.image: pygame.Surface = self.randomize_splat()
         self.rect: pygame.Rect = pygame.Rect(*adjusted_position, 32, 32)
@@ -300,25 +399,41 @@ class SpiderBloodSplat(pygame.sprite.Sprite):
             pygame.Surface: The modified blood splat image.
         """
 
-        scale_factor: float = uniform(a=0.20, b=0.25)
-        selected_splat: pygame.Surface = choice(self.blood_splats_list)
-        rotated_splat = pygame.transform.rotate(selected_splat, randint(a=1, b=360))
-        scaled_and_rotated_splat = pygame.transform.scale(
-            surface=rotated_splat,
-            size=(rotated_splat.get_width() * scale_factor, rotated_splat.get_height() * scale_factor)
+        scale_factor: float = simulation.random.uniform(a=0.20, b=0.25)
+        selected_splat: pygame.Surface = simulation.random.choice(self.blood_splats_list)
+
+        # Scaling before rotating gives practically the same result while rotating a much smaller surface.
+        scaled_splat = pygame.transform.scale(
+            surface=selected_splat,
+            size=(selected_splat.get_width() * scale_factor, selected_splat.get_height() * scale_factor)
         )
+        scaled_and_rotated_splat = pygame.transform.rotate(scaled_splat, simulation.random.randint(a=1, b=360))
 
         return scaled_and_rotated_splat
 
-    def update(self) -> None:
 
-        self.animation_frame_delay -= 1
+def bake_rotated_frames() -> None:
+    """Builds the rotated frames of every spider animation ahead of time, rather than when a spider first turns."""
 
-        if self.animation_frame_delay <= 0:
+    adult_spider: AdultSpider = adult_spider_pool.acquire()
+    baby_spider: BabySpider = baby_spider_pool.acquire(spawn_position=(0, 0))
 
-            self.animation_frame_delay = 5
-            self.opacity -= 1
-            self.image.set_alpha(self.opacity)
+    for spider, idle_sprites, attacking_sprites in (
+        (adult_spider, adult_spider.adult_idle_sprites, adult_spider.adult_attacking_sprites),
+        (baby_spider, baby_spider.baby_idle_sprites, baby_spider.baby_attacking_sprites)
+    ):
 
-        if self.opacity <= 0:
-            self.kill()
+        if (spider.species, "idle", 0, toolkit.Direction.NORTH) not in rotated_frames:
+            spider.build_rotated_frames(sprites=idle_sprites, animation="idle")
+
+        if (spider.species, "attack", 0, toolkit.Direction.NORTH) not in rotated_frames:
+            spider.build_rotated_frames(sprites=attacking_sprites, animation="attack")
+
+    adult_spider_pool.release(adult_spider)
+    baby_spider_pool.release(baby_spider)
+
+
+adult_spider_pool = toolkit.ObjectPool(AdultSpider, cap=512)
+baby_spider_pool = toolkit.ObjectPool(BabySpider, cap=512)
+splash_pool = toolkit.ObjectPool(SpiderBloodSplash, cap=64)
+splat_pool = toolkit.ObjectPool(SpiderBloodSplat, cap=32)
@@ -0,0 +1,335 @@
+"""
+This module contains the spider swarm engine, an optional alternative to spider sprites
+designed to simulate thousands of spiders at once.
+"""
+
+import numpy as np
+import pygame
+from pygame.sprite import AbstractGroup
+
+from modules import toolkit
+from modules.decals import decal_layer
+from modules.pursuit import PursuitField
+from modules.simulation import simulation
+from modules.spawner import spawn_scheduler
+from modules.spiders import (
+    AdultSpider, bake_rotated_frames, rotated_frames, spider_blood_effects, splash_pool, splat_pool
+)
+
+
+ADULT: int = 0
+BABY: int = 1
+SPECIES: tuple = ("adult", "baby")
+# Size of the rectangle of the spider sprites of each species, placed by their top left corner.
+SPRITE_SIZES: tuple = (32, 24)
+
+# Per-species parameters, indexed by species code.
+VELOCITY = np.array([2, 3], dtype=np.float32)
+IDLE_DELAY = np.array([6, 3], dtype=np.int32)
+ATTACK_DELAY = np.array([12, 6], dtype=np.int32)
+IDLE_FRAMES: int = 7
+ATTACK_FRAMES: int = 3
+DEAD_ZONE: int = 10
+
+
+class SpiderSwarm:
+    """
+    Simulates spiders as a structure of arrays: positions, species, animation counters and directions
+    of every spider are stored in contiguous NumPy arrays and updated with one vectorized pass per frame.
+    Only the images, rectangles and masks needed for drawing and collisions are kept per spider.
+    """
+
+    def __init__(self, capacity: int = 256):
+
+        self.game_surface: pygame.Surface = pygame.display.get_surface()
+        self.size: int = 0
+
+        self.positions = np.zeros((capacity, 2), dtype=np.float32)
+        self.previous_positions = np.zeros((capacity, 2), dtype=np.float32)
+        self.species = np.zeros(capacity, dtype=np.int8)
+        self.directions = np.zeros(capacity, dtype=np.int8)
+        self.attacking = np.zeros(capacity, dtype=np.bool_)
+        self.idle_frame_indexes = np.zeros(capacity, dtype=np.int8)
+        self.attacking_frame_indexes = np.zeros(capacity, dtype=np.int8)
+        self.animation_frame_delays = np.zeros(capacity, dtype=np.int32)
+        self.half_sizes = np.zeros((capacity, 2), dtype=np.int32)
+
+        self.images: list[pygame.Surface] = []
+        self.shadows: list[pygame.Surface] = []
+        self.masks: list[pygame.mask.Mask] = []
+
+        ##############################
+        # Assets.
+        ##############################
+
+        # A template spider gives access to the shared sounds of the spiders.
+        self.death_sounds: list = AdultSpider().death_sounds
+        bake_rotated_frames()
+
+    def __len__(self) -> int:
+
+        return self.size
+
+    def _grow(self) -> None:
+
+        for name in (
+            "positions", "previous_positions", "species", "directions", "attacking", "idle_frame_indexes",
+            "attacking_frame_indexes", "animation_frame_delays", "half_sizes"
+        ):
+            array: np.ndarray = getattr(self, name)
+            setattr(self, name, np.concatenate((array, np.zeros_like(array))))
+
+    def _set_frame(self, index: int, animation: str, frame_index: int) -> None:
+
+        key: tuple = (
+            SPECIES[self.species[index]], animation, int(frame_index), toolkit.DIRECTIONS[self.directions[index]]
+        )
+        image, image_rect, mask = rotated_frames[key]
+
+        self.images[index] = image
+        self.shadows[index] = toolkit.asset_registry.get_shadow(image)
+        self.masks[index] = mask
+        self.half_sizes[index] = image_rect.width // 2, image_rect.height // 2
+
+    def spawn(self, species: int, position: tuple[int, int]) -> None:
+        """Adds a spider to the swarm.
+
+        Args:
+            species (int): The species code of the spider, ADULT or BABY.
+            position (tuple[int, int]): The position of the center of the spider.
+        """
+
+        if self.size == len(self.positions):
+            self._grow()
+
+        index: int = self.size
+        self.size += 1
+
+        self.positions[index] = position
+        self.previous_positions[index] = position
+        self.species[index] = species
+        self.directions[index] = toolkit.DIRECTION_CODES[toolkit.Direction.NONE]
+        self.attacking[index] = False
+        self.idle_frame_indexes[index] = 0
+        self.attacking_frame_indexes[index] = 0
+        self.animation_frame_delays[index] = 0
+
+        self.images.append(None)  # type: ignore
+        self.shadows.append(None)  # type: ignore
+        self.masks.append(None)  # type: ignore
+        self._set_frame(index, "idle", 0)
+
+    def spawn_like_sprite(self, species: str, position: tuple[int, int]) -> None:
+        """Adds a spider where a spider sprite would appear.
+
+        Args:
+            species (str): The species of the spider, "adult" or "baby".
+            position (tuple[int, int]): The top left corner of the rectangle of the sprite.
+        """
+
+        code: int = SPECIES.index(species)
+        half_size: int = SPRITE_SIZES[code] // 2
+        self.spawn(species=code, position=(position[0] + half_size, position[1] + half_size))
+
+    def kill(self, index: int) -> None:
+        """Removes a spider from the swarm and plays its death, as Spider.kill does.
+        The last spider takes the place of the removed one, so indexes above this one become invalid.
+
+        Args:
+            index (int): The index of the spider to remove.
+        """
+
+        center: tuple[int, int] = int(self.positions[index][0]), int(self.positions[index][1])
+        species: int = int(self.species[index])
+
+        simulation.random.choice(self.death_sounds).play()
+        decal_layer.add(splat_pool.acquire(position=center))
+        spider_blood_effects.add(splash_pool.acquire(position=center))
+
+        last: int = self.size - 1
+
+        for array in (
+            self.positions, self.previous_positions, self.species, self.directions, self.attacking,
+            self.idle_frame_indexes, self.attacking_frame_indexes, self.animation_frame_delays, self.half_sizes
+        ):
+            array[index] = array[last]
+
+        for values in (self.images, self.shadows, self.masks):
+
+            values[index] = values[last]
+            values.pop()
+
+        self.size = last
+
+        if species == ADULT and not simulation.random.randint(a=0, b=2):  # 1 in 3 chance to lay eggs.
+
+            for i in range(simulation.random.randint(a=1, b=5)):
+                spawn_scheduler.request("baby", (center[0] - 20 * i, center[1] - 20 * i))
+
+    def update(self, player_position: tuple[int, int], pursuit_field: PursuitField | None = None) -> None:
+        """Moves, orients and animates the whole swarm.
+
+        Args:
+            player_position (tuple[int, int]): The position of the player as a tuple of (x, y) coordinates.
+            pursuit_field (PursuitField | None, optional): A field to steer the spiders with,
+                instead of computing the way to the player of each one.
+        """
+
+        size: int = self.size
+
+        if not size:
+            return
+
+        species = self.species[:size]
+
+        if pursuit_field is not None:
+            movements, directions, moving = pursuit_field.steer(self.positions[:size], VELOCITY[species], DEAD_ZONE)
+            self.positions[:size] += movements
+        else:
+            dx = np.empty(size, dtype=np.float32)
+            dy = np.empty(size, dtype=np.float32)
+
+            moving = toolkit.kernels.pursue(
+                self.positions[:size], player_position[0], player_position[1], DEAD_ZONE, VELOCITY[species], dx, dy
+            )
+            directions = toolkit.get_directions(dx, dy)
+
+        self.attacking[:size] = ~moving
+        self.directions[:size] = directions
+        self.animation_frame_delays[:size] -= 1
+
+        # Only the spiders reaching the end of their frame delay change image.
+        animated = self.animation_frame_delays[:size] <= 0
+        idle = animated & moving
+        attacking = animated & ~moving
+
+        self.idle_frame_indexes[:size][idle] = (self.idle_frame_indexes[:size][idle] + 1) % IDLE_FRAMES
+        self.attacking_frame_indexes[:size][attacking] = (
+            (self.attacking_frame_indexes[:size][attacking] + 1) % ATTACK_FRAMES
+        )
+        self.animation_frame_delays[:size][idle] = IDLE_DELAY[species[idle]]
+        self.animation_frame_delays[:size][attacking] = ATTACK_DELAY[species[attacking]]
+
+        for index in np.flatnonzero(idle).tolist():
+
+            self._set_frame(index, "idle", self.idle_frame_indexes[index])
+
+        for index in np.flatnonzero(attacking).tolist():
+
+            self._set_frame(index, "attack", self.attacking_frame_indexes[index])
+
+    def store_positions(self) -> None:
+        """Remembers the positions of the spiders before a tick, so that they can be drawn in between."""
+
+        self.previous_positions[:self.size] = self.positions[:self.size]
+
+    @property
+    def topleft_positions(self) -> np.ndarray:
+
+        return self.positions[:self.size].astype(np.int32) - self.half_sizes[:self.size]
+
+    def get_render_positions(self, alpha: float = 1) -> np.ndarray:
+        """Returns the top left corners the spiders are drawn at.
+
+        Args:
+            alpha (float, optional): How far to draw the spiders between their stored and current positions.
+
+        Returns:
+            np.ndarray: The positions, their current ones if alpha is 1.
+        """
+
+        if alpha >= 1:
+            return self.topleft_positions
+
+        previous = self.previous_positions[:self.size]
+        positions = previous + (self.positions[:self.size] - previous) * alpha
+
+        return positions.astype(np.int32) - self.half_sizes[:self.size]
+
+    def draw_shadows(self, alpha: float = 1) -> None:
+
+        if self.size:
+            positions: list = (self.get_render_positions(alpha) + (-4, 4)).tolist()
+            self.game_surface.blits(zip(self.shadows, positions), doreturn=False)
+
+    def get_rects(self, shadow: bool = False, alpha: float = 1) -> list[pygame.Rect]:
+        """Returns the areas covered by the images of the spiders.
+
+        Args:
+            shadow (bool, optional): Whether to include the shadows, drawn 4 pixels left and down.
+            alpha (float, optional): How far the spiders are drawn between their stored and current positions.
+
+        Returns:
+            list[pygame.Rect]: One rectangle per spider.
+        """
+
+        # Half sizes are rounded down, hence the extra pixel.
+        sizes: list = (self.half_sizes[:self.size] * 2 + (5 if shadow else 1)).tolist()
+        positions: list = (self.get_render_positions(alpha) - ((4, 0) if shadow else (0, 0))).tolist()
+
+        return [pygame.Rect(position, size) for position, size in zip(positions, sizes)]
+
+    def draw(self, alpha: float = 1) -> None:
+
+        if self.size:
+            positions: list = self.get_render_positions(alpha).tolist()
+            self.game_surface.blits(zip(self.images, positions), doreturn=False)
+
+    def collide(self, group: AbstractGroup, kill_group: bool, kill_spiders: bool, use_mask: bool = True) -> bool:
+        """Detects collisions between the sprites of a group and the swarm, as toolkit.detect_collision does.
+
+        Args:
+            group (AbstractGroup): The sprites to test against the swarm.
+            kill_group (bool): Whether to kill the sprites of the group that collide.
+            kill_spiders (bool): Whether to kill the spiders that collide.
+            use_mask (bool, optional): Whether to confirm rectangle collisions with a mask test.
+
+        Returns:
+            bool: True if at least one collision occurred.
+        """
+
+        collided_sprites: list = []
+
+        for sprite in group.sprites():
+
+            if not self.size:
+                break
+
+            rect: pygame.Rect = sprite.rect
+            topleft = self.topleft_positions
+            bottomright = topleft + self.half_sizes[:self.size] * 2
+
+            candidates = np.flatnonzero(
+                (topleft[:, 0] < rect.right) & (bottomright[:, 0] > rect.left)
+                & (topleft[:, 1] < rect.bottom) & (bottomright[:, 1] > rect.top)
+            )
+
+            hits: list[int] = [
+                index for index in candidates.tolist()
+                if not use_mask or sprite.mask.overlap(
+                    self.masks[index], (int(topleft[index][0]) - rect.x, int(topleft[index][1]) - rect.y)
+                )
+            ]
+
+            if not hits:
+                continue
+
+            if not kill_group and not kill_spiders:
+                return True
+
+            collided_sprites.append(sprite)
+
+            if kill_spiders:
+
+                # Killing from the highest index keeps the lower indexes valid.
+                for index in sorted(hits, reverse=True):
+
+                    self.kill(index)
+
+        if kill_group:
+
+            for sprite in collided_sprites:
+
+                sprite.kill()
+
+        return bool(collided_sprites)
@@ -2,13 +2,18 @@
 This module contains useful elements that can be used several times.
 """
 
+import os
+import numpy as np
 import pygame
+from concurrent.futures import Future, ThreadPoolExecutor
+from importlib import import_module
+from time import perf_counter
+from typing import Callable
 from pygame.sprite import collide_mask, AbstractGroup
 from random import randint
 from pathlib import Path
-from math import sqrt
 from enum import Enum, auto
-from numba import jit
+from types import ModuleType
 
 
 class SpritesLoader:
@@ -49,6 +54,707 @@ class SpritesLoader:
         return [self._get_sprite(i, scale_factor=scale_factor) for i in range(self.sprites_number)]
 
 
+class AssetRegistry:
+    """
+    Process-wide cache for images, sprite frames, sounds and fonts.
+    Every resource is loaded from disk once per key and then shared by all the entities that request it.
+    """
+
+    def __init__(self):
+
+        self.folders: dict = {}
+        self.images: dict = {}
+        self.sprites: dict = {}
+        self.scaled_surfaces: dict = {}
+        self.shadows: dict = {}
+        self.shadow_hits: int = 0
+        self.shadow_misses: int = 0
+        self.masks: dict = {}
+        self.sounds: dict = {}
+        self.fonts: dict = {}
+        self.atlas_frames: dict = {}
+
+    def get_folder(self, folder: Path, alpha: bool = False) -> dict:
+        """Returns the images of a folder, loading them on the first request only.
+
+        Args:
+            folder (Path): The path to the folder containing the images.
+            alpha (bool, optional): Whether to load images with alpha transparency. Defaults to False.
+
+        Returns:
+            dict: The images of the folder, keyed by filename (without extension).
+        """
+
+        key = (Path(folder), alpha)
+
+        # Images are loaded one by one, so those already decoded by an AssetLoader are reused.
+        if key not in self.folders:
+            self.folders[key] = {
+                image.stem: self.get_image(image, alpha=alpha) for image in Path(folder).iterdir() if image.is_file()
+            }
+
+        return self.folders[key]
+
+    def get_image(self, file: Path, alpha: bool = False) -> pygame.Surface:
+        """Returns a single image, loading it on the first request only.
+
+        Args:
+            file (Path): The path to the image file.
+            alpha (bool, optional): Whether to load the image with alpha transparency. Defaults to False.
+
+        Returns:
+            pygame.Surface: The shared surface of the image.
+        """
+
+        key = (Path(file), alpha)
+
+        if key not in self.images:
+            image: pygame.Surface = pygame.image.load(file)
+            self.images[key] = image.convert_alpha() if alpha else image.convert()
+
+        return self.images[key]
+
+    def get_sprites(
+            self,
+            sprites_image: pygame.Surface,
+            sprites_size: int,
+            sprites_number: int,
+            scale_factor: float = 1,
+            flip: bool = False
+    ) -> list[pygame.Surface]:
+        """Returns the sliced frames of a sprite sheet, slicing it on the first request only.
+
+        Args:
+            sprites_image (pygame.Surface): The sprite sheet, preferably obtained from this registry.
+            sprites_size (int): The size of a single frame in the sheet.
+            sprites_number (int): The number of frames in the sheet.
+            scale_factor (float, optional): The factor by which to scale the frames.
+            flip (bool, optional): Whether to flip the frames horizontally.
+
+        Returns:
+            list[pygame.Surface]: The shared list of frames.
+        """
+
+        key = (sprites_image, sprites_size, sprites_number, scale_factor, flip)
+
+        if key not in self.sprites:
+
+            if flip:
+                frames = self.get_sprites(sprites_image, sprites_size, sprites_number, scale_factor)
+                self.sprites[key] = [pygame.transform.flip(frame, True, False) for frame in frames]
+            else:
+                loader = SpritesLoader(sprites_image, sprites_size, sprites_number)
+                self.sprites[key] = loader.sprite_surfaces(scale_factor=scale_factor)
+
+        return self.sprites[key]
+
+    def get_scaled(self, surface: pygame.Surface, size: tuple[int, int]) -> pygame.Surface:
+        """Returns a scaled variant of a shared surface, scaling it on the first request only.
+
+        Args:
+            surface (pygame.Surface): The surface to scale.
+            size (tuple[int, int]): The requested size.
+
+        Returns:
+            pygame.Surface: The shared scaled surface.
+        """
+
+        key = (surface, tuple(size))
+
+        if key not in self.scaled_surfaces:
+            self.scaled_surfaces[key] = pygame.transform.scale(surface, size)
+
+        return self.scaled_surfaces[key]
+
+    def get_scaled2x(self, surface: pygame.Surface) -> pygame.Surface:
+        """Returns the scale2x variant of a shared surface, computing it on the first request only.
+
+        Args:
+            surface (pygame.Surface): The surface to scale.
+
+        Returns:
+            pygame.Surface: The shared surface, twice as large.
+        """
+
+        key = (surface, "scale2x")
+
+        if key not in self.scaled_surfaces:
+            self.scaled_surfaces[key] = pygame.transform.scale2x(surface)
+
+        return self.scaled_surfaces[key]
+
+    def get_shadow(self, surface: pygame.Surface) -> pygame.Surface:
+        """Returns the drop shadow of a shared surface, computing it on the first request only.
+        The shadow_hits and shadow_misses counters record how the cache performs.
+
+        Args:
+            surface (pygame.Surface): The surface casting the shadow.
+
+        Returns:
+            pygame.Surface: The shared shadow surface.
+        """
+
+        shadow: pygame.Surface | None = self.shadows.get(surface)
+
+        if shadow is None:
+            self.shadow_misses += 1
+            shadow = self.shadows[surface] = get_shadow_surface(surface)
+        else:
+            self.shadow_hits += 1
+
+        return shadow
+
+    @property
+    def shadow_statistics(self) -> dict:
+
+        return {"shadows": len(self.shadows), "hits": self.shadow_hits, "misses": self.shadow_misses}
+
+    def bake_shadows(self, surfaces: list[pygame.Surface]) -> None:
+        """Computes the drop shadows of several surfaces ahead of time.
+
+        Args:
+            surfaces (list[pygame.Surface]): The surfaces casting the shadows.
+        """
+
+        for surface in surfaces:
+
+            if surface not in self.shadows:
+                self.shadow_misses += 1
+                self.shadows[surface] = get_shadow_surface(surface)
+
+    def get_mask(self, surface: pygame.Surface) -> pygame.mask.Mask:
+        """Returns the collision mask of a shared surface, computing it on the first request only.
+
+        Args:
+            surface (pygame.Surface): The surface to build the mask from.
+
+        Returns:
+            pygame.mask.Mask: The shared mask.
+        """
+
+        mask: pygame.mask.Mask | None = self.masks.get(surface)
+
+        if mask is None:
+            mask = self.masks[surface] = pygame.mask.from_surface(surface)
+
+        return mask
+
+    def bake_masks(self, surfaces: list[pygame.Surface]) -> None:
+        """Computes the collision masks of several surfaces ahead of time.
+
+        Args:
+            surfaces (list[pygame.Surface]): The surfaces to build the masks from.
+        """
+
+        for surface in surfaces:
+
+            self.get_mask(surface)
+
+    def get_sound(self, file: Path, volume: float = 1) -> pygame.mixer.Sound:
+        """Returns a sound, decoding it on the first request only.
+
+        Args:
+            file (Path): The path to the audio file.
+            volume (float, optional): The volume applied to the sound.
+
+        Returns:
+            pygame.mixer.Sound: The shared sound.
+        """
+
+        key = Path(file)
+
+        if key not in self.sounds:
+            self.sounds[key] = pygame.mixer.Sound(file)
+
+        self.sounds[key].set_volume(volume)
+        return self.sounds[key]
+
+    def get_font(self, file: Path, size: int) -> pygame.font.Font:
+        """Returns a font, opening it on the first request only.
+
+        Args:
+            file (Path): The path to the font file.
+            size (int): The size of the font.
+
+        Returns:
+            pygame.font.Font: The shared font.
+        """
+
+        key = (Path(file), size)
+
+        if key not in self.fonts:
+            self.fonts[key] = pygame.font.Font(file, size)
+
+        return self.fonts[key]
+
+    def load_atlas(self, atlas) -> None:
+        """Fills the caches with the frames of a sprite atlas, so that the images, sprite frames
+        and scaled surfaces it holds are never loaded nor computed.
+
+        Args:
+            atlas (SpriteAtlas): A loaded atlas, see modules.atlas.
+        """
+
+        self.atlas_frames.update(atlas.frames)
+        sprites: dict = {}
+
+        for entry in atlas.entries:
+
+            if entry["kind"] == "image":
+                self.images[(entry["path"], True)] = atlas.frames[entry["id"]]
+
+        for entry in atlas.entries:
+
+            if entry["kind"] == "sprites":
+                key = (
+                    atlas.frames[entry["sheet"]], entry["size"], entry["number"], entry["scale"], entry["flip"]
+                )
+                sprites.setdefault(key, [None] * entry["number"])[entry["index"]] = atlas.frames[entry["id"]]
+
+            elif entry["kind"] == "scaled":
+                size = entry["size"] if entry["size"] == "scale2x" else tuple(entry["size"])
+                self.scaled_surfaces[(atlas.frames[entry["source"]], size)] = atlas.frames[entry["id"]]
+
+        self.sprites.update(sprites)
+
+    def get_atlas_frame(self, frame_id: str) -> pygame.Surface | None:
+
+        return self.atlas_frames.get(frame_id)
+
+
+asset_registry = AssetRegistry()
+
+
+class AssetLoader:
+    """
+    Decodes image and sound files on a pool of threads, decoding releasing the GIL, and hands them
+    to the main thread, which converts the images for the display and stores everything in an asset registry.
+    Progress callbacks are called with the number of loaded files and the total number of queued files.
+    """
+
+    def __init__(self, registry: AssetRegistry, workers: int | None = None):
+
+        self.registry: AssetRegistry = registry
+        self.executor = ThreadPoolExecutor(max_workers=workers or os.cpu_count(), thread_name_prefix="asset-loader")
+        self.pending: list[tuple[str, tuple, Future]] = []
+        self.queued: int = 0
+        self.loaded: int = 0
+        self.progress_callbacks: list[Callable[[int, int], None]] = []
+
+    @property
+    def finished(self) -> bool:
+
+        return not self.pending
+
+    def add_progress_callback(self, callback: Callable[[int, int], None]) -> None:
+
+        self.progress_callbacks.append(callback)
+
+    def queue_image(self, file: Path, alpha: bool = False) -> None:
+
+        key = (Path(file), alpha)
+
+        if key not in self.registry.images:
+            self.pending.append(("image", key, self.executor.submit(pygame.image.load, file)))
+            self.queued += 1
+
+    def queue_sound(self, file: Path) -> None:
+
+        key = Path(file)
+
+        if key not in self.registry.sounds:
+            self.pending.append(("sound", key, self.executor.submit(pygame.mixer.Sound, file)))
+            self.queued += 1
+
+    def queue_folder(self, folder: Path, alpha: bool = False) -> None:
+        """Queues every file of a folder, as images, or as sounds for the folders of the audio directory.
+
+        Args:
+            folder (Path): The path to the folder.
+            alpha (bool, optional): Whether to load the images with alpha transparency. Defaults to False.
+        """
+
+        for file in Path(folder).iterdir():
+
+            if not file.is_file():
+                continue
+
+            if file.suffix in (".wav", ".ogg"):
+                self.queue_sound(file)
+            else:
+                self.queue_image(file, alpha=alpha)
+
+    def update(self, budget: float = 4) -> None:
+        """Stores the files decoded since the previous update, converting images for the display.
+        Must be called from the main thread.
+
+        Args:
+            budget (float, optional): The time in milliseconds after which the remaining files wait for the next update.
+        """
+
+        start: float = perf_counter()
+        pending: list[tuple[str, tuple, Future]] = []
+
+        for kind, key, future in self.pending:
+
+            if not future.done() or (perf_counter() - start) * 1000 > budget:
+                pending.append((kind, key, future))
+                continue
+
+            if kind == "image":
+                self.registry.images[key] = future.result().convert_alpha() if key[1] else future.result().convert()
+            else:
+                self.registry.sounds[key] = future.result()
+
+            self.loaded += 1
+
+            for callback in self.progress_callbacks:
+
+                callback(self.loaded, self.queued)
+
+        self.pending = pending
+
+    def wait(self) -> None:
+        """Waits for every queued file and stores them all."""
+
+        while self.pending:
+
+            self.pending[0][2].result()
+            self.update(budget=float("inf"))
+
+
+class LazyModule:
+    """
+    Stands for a module which is only imported when one of its attributes is first accessed,
+    or ahead of time by calling load(), possibly from a background thread.
+    Once loaded, the attributes of the module are copied onto this object, so accessing them costs nothing more.
+    """
+
+    def __init__(self, name: str):
+
+        self.module_name: str = name
+
+    def load(self) -> ModuleType:
+
+        module: ModuleType = import_module(self.module_name)
+        self.__dict__.update((name, value) for name, value in vars(module).items() if not name.startswith("__"))
+
+        return module
+
+    def __getattr__(self, name: str):
+
+        return getattr(self.load(), name)
+
+
+# Importing Numba takes a while, so the kernels are only imported when needed.
+kernels = LazyModule("modules.kernels")
+
+
+class LightMap:
+    """
+    A single light layer shared by every light emitter of the game.
+    Emitters stamp pre-rendered glow sprites into it and the layer is composited once per frame.
+    """
+
+    def __init__(self, size: tuple[int, int], color: tuple[int, int, int], intensity: int):
+
+        self.color: tuple[int, int, int] = color
+        self.intensity: int = intensity
+        self.glow_sprites: dict = {}
+        self.stamped_rects: list[pygame.Rect] = []
+
+        # The color of the layer never changes, only the alpha channel accumulates the light.
+        self.light_surface: pygame.Surface = pygame.Surface(size, pygame.SRCALPHA)
+        self.light_surface.fill((*self.color, 0))
+
+    def get_glow_sprite(self, radius: int) -> pygame.Surface:
+        """Returns the glow sprite of a given radius, rendering it on the first request only.
+
+        Args:
+            radius (int): The radius of the glow.
+
+        Returns:
+            pygame.Surface: A surface holding only the alpha of the glow.
+        """
+
+        if radius not in self.glow_sprites:
+
+            glow_sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(glow_sprite, (0, 0, 0, self.intensity), (radius, radius), radius)
+            self.glow_sprites[radius] = glow_sprite
+
+        return self.glow_sprites[radius]
+
+    def add_light(self, position: tuple[int, int], radius: int) -> None:
+        """Stamps a glow into the light layer.
+
+        Args:
+            position (tuple[int, int]): The center of the glow.
+            radius (int): The radius of the glow.
+        """
+
+        glow_sprite: pygame.Surface = self.get_glow_sprite(radius)
+        rect = self.light_surface.blit(
+            glow_sprite,
+            (position[0] - radius, position[1] - radius),
+            special_flags=pygame.BLEND_RGBA_ADD
+        )
+
+        if rect.width and rect.height:
+            self.stamped_rects.append(rect)
+
+    def render(self, surface: pygame.Surface) -> pygame.Rect | None:
+        """Composites the light layer onto a surface and clears it for the next frame.
+
+        Args:
+            surface (pygame.Surface): The surface receiving the light.
+
+        Returns:
+            pygame.Rect | None: The lit area of the surface, if any.
+        """
+
+        if not self.stamped_rects:
+            return None
+
+        lit_area: pygame.Rect = self.stamped_rects[0].unionall(self.stamped_rects)
+        surface.blit(self.light_surface, lit_area, area=lit_area)
+
+        # Only the areas lit during this frame need to be cleared.
+        for rect in self.stamped_rects:
+
+            self.light_surface.fill((*self.color, 0), rect)
+
+        self.stamped_rects.clear()
+        return lit_area
+
+
+class DirtyRectRenderer:
+    """
+    Tracks the areas of the screen drawn during a frame, so that only those areas and the ones drawn
+    during the previous frame have to be restored and pushed to the display. When the changed area
+    gets too large, or a full update is requested, the whole screen is updated instead.
+    """
+
+    def __init__(self, size: tuple[int, int], max_dirty_ratio: float = 0.5, tile_size: int = 30):
+
+        self.enabled: bool = False
+        self.tile_size: int = tile_size
+        self.max_dirty_tiles: float = (size[0] // tile_size + 1) * (size[1] // tile_size + 1) * max_dirty_ratio
+        self.rects: list[pygame.Rect] = []
+        self.previous_rects: list[pygame.Rect] = []
+        self.full_update: bool = True
+        self.redraw_background: bool = True
+        self.full_updates: int = 0
+        self.partial_updates: int = 0
+
+    def add(self, rect: pygame.Rect | None) -> None:
+
+        if rect is not None:
+            self.rects.append(rect)
+
+    def add_sprites(self, sprites, shadow: bool = False, positions: list | None = None) -> None:
+        """Marks the areas covered by the images of several sprites as drawn.
+
+        Args:
+            sprites: The sprites, drawn at the top left corner of their rectangle.
+            shadow (bool, optional): Whether the sprites also cast a shadow, drawn 4 pixels left and down.
+            positions (list | None, optional): The top left corners the sprites were drawn at, if not their rectangles.
+        """
+
+        if positions is None:
+            positions = [sprite.rect.topleft for sprite in sprites]
+
+        for sprite, (x, y) in zip(sprites, positions):
+
+            width, height = sprite.image.get_size()
+
+            if shadow:
+                self.rects.append(pygame.Rect(x - 4, y, width + 4, height + 4))
+            else:
+                self.rects.append(pygame.Rect(x, y, width, height))
+
+    def request_full_update(self) -> None:
+        """Updates the whole screen at the end of the frame and redraws the whole background at the next one."""
+
+        self.full_update = True
+
+    def restore_background(
+            self,
+            surface: pygame.Surface,
+            background: pygame.Surface,
+            changed_rects: list[pygame.Rect] | None = None,
+            changed: bool = False
+    ) -> None:
+        """Draws the background over the areas drawn during the previous frame and the areas of the background
+        that changed since, or over the whole screen if needed. Changes of the background are marked as drawn,
+        so that they are pushed with the frame they are drawn in.
+
+        Args:
+            surface (pygame.Surface): The surface to restore.
+            background (pygame.Surface): The background, as large as the surface.
+            changed_rects (list[pygame.Rect], optional): The areas of the background that changed.
+            changed (bool, optional): Whether the whole background changed.
+        """
+
+        changed_rects = changed_rects or []
+        self.rects.extend(changed_rects)
+
+        if changed:
+            self.request_full_update()
+
+        if self.redraw_background or changed:
+            surface.blit(background, (0, 0))
+            return
+
+        for rect in self.previous_rects + changed_rects:
+
+            surface.blit(background, rect, area=rect)
+
+    def count_dirty_tiles(self, rects: list[pygame.Rect]) -> int:
+        """Estimates the area covered by overlapping rectangles, as the number of screen tiles they touch.
+
+        Args:
+            rects (list[pygame.Rect]): The rectangles.
+
+        Returns:
+            int: The number of distinct tiles touched by the rectangles.
+        """
+
+        size: int = self.tile_size
+        tiles: set = set()
+
+        for rect in rects:
+
+            for tile_x in range(max(rect.left, 0) // size, max(rect.right - 1, 0) // size + 1):
+
+                for tile_y in range(max(rect.top, 0) // size, max(rect.bottom - 1, 0) // size + 1):
+
+                    tiles.add((tile_x, tile_y))
+
+        return len(tiles)
+
+    def present(self) -> None:
+        """Pushes the changed areas of the screen to the display and starts a new frame."""
+
+        dirty_rects: list[pygame.Rect] = self.previous_rects + self.rects
+
+        if self.full_update or self.count_dirty_tiles(dirty_rects) > self.max_dirty_tiles:
+            pygame.display.update()
+            self.full_updates += 1
+        else:
+            pygame.display.update(dirty_rects)
+            self.partial_updates += 1
+
+        self.redraw_background = self.full_update
+        self.previous_rects, self.rects = self.rects, []
+        self.full_update = False
+
+
+class ObjectPool:
+    """
+    Recycles the instances of a class instead of constructing new ones.
+    Released instances are kept up to a cap, and acquiring one calls its reset method with
+    the arguments that would have been given to the constructor.
+    """
+
+    def __init__(self, factory: type, cap: int = 256):
+
+        self.factory: type = factory
+        self.cap: int = cap
+        self.free_instances: list = []
+        self.created: int = 0
+        self.reused: int = 0
+        self.released: int = 0
+        self.discarded: int = 0
+
+        object_pools[factory] = self
+
+    def acquire(self, *args, **kwargs):
+        """Returns a reset instance from the pool, or a new one if the pool is empty.
+
+        Returns:
+            An instance of the factory class.
+        """
+
+        if self.free_instances:
+            instance = self.free_instances.pop()
+            instance.pooled = False
+            instance.reset(*args, **kwargs)
+            self.reused += 1
+            return instance
+
+        self.created += 1
+        return self.factory(*args, **kwargs)
+
+    def release(self, instance) -> None:
+        """Gives an instance back to the pool, unless the pool is full or already holds it.
+
+        Args:
+            instance: An instance of the factory class that is no longer used.
+        """
+
+        if getattr(instance, "pooled", False):
+            return
+
+        if len(self.free_instances) >= self.cap:
+            self.discarded += 1
+            return
+
+        instance.pooled = True
+        self.free_instances.append(instance)
+        self.released += 1
+
+    def reset_statistics(self) -> None:
+
+        self.created = self.reused = self.released = self.discarded = 0
+
+    @property
+    def statistics(self) -> dict:
+
+        return {
+            "free": len(self.free_instances),
+            "cap": self.cap,
+            "created": self.created,
+            "reused": self.reused,
+            "released": self.released,
+            "discarded": self.discarded
+        }
+
+
+# Every object pool, keyed by the class of its instances.
+object_pools: dict = {}
+
+
+def get_pool_statistics() -> dict:
+    """Returns the statistics of every object pool.
+
+    Returns:
+        dict: The statistics of each pool, keyed by the name of the class of its instances.
+    """
+
+    return {factory.__name__: pool.statistics for factory, pool in object_pools.items()}
+
+
+def reset_pool_statistics() -> None:
+
+    for pool in object_pools.values():
+
+        pool.reset_statistics()
+
+
+def release(instance) -> None:
+    """Gives an instance back to the pool of its class, if there is one.
+
+    Args:
+        instance: The instance that is no longer used.
+    """
+
+    pool: ObjectPool | None = object_pools.get(type(instance))
+
+    if pool is not None:
+        pool.release(instance)
+
+
 class GameState(Enum):
     """
     Enumeration representing different states of the game.
@@ -75,19 +781,159 @@ class Direction(Enum):
     NONE = 0
 
 
-def detect_collision(group_a: AbstractGroup, group_b: AbstractGroup, kill_a: bool, kill_b: bool) -> bool:
+# Integer codes of the directions, as used by the batched functions. Direction.NONE is an alias of
+# Direction.NORTH, so the position of Direction.NORTH in this tuple is also the code of Direction.NONE.
+DIRECTIONS: tuple = tuple(Direction)
+DIRECTION_CODES: dict = {direction: code for code, direction in enumerate(DIRECTIONS)}
+
+
+class SpatialHash:
+    """
+    A uniform grid used as a collision broadphase: sprites are bucketed by the cells their rectangle
+    overlaps, so that only sprites sharing a cell have to be tested against each other.
+    """
+
+    def __init__(self, cell_size: int = 64):
+
+        self.cell_size: int = cell_size
+        self.cells: dict = {}
+
+    def _cells(self, rect: pygame.Rect):
+        """Yields the coordinates of every cell overlapped by a rectangle.
+
+        Args:
+            rect (pygame.Rect): The rectangle to locate.
+        """
+
+        size = self.cell_size
+
+        for cell_x in range(rect.left // size, (rect.right - 1) // size + 1):
+
+            for cell_y in range(rect.top // size, (rect.bottom - 1) // size + 1):
+
+                yield cell_x, cell_y
+
+    def build(self, group: AbstractGroup) -> None:
+        """Clears the grid and inserts every sprite of a group.
+
+        Args:
+            group (AbstractGroup): The sprites to insert.
+        """
 
-    if not pygame.sprite.groupcollide(group_a, group_b, False, False):
+        self.cells.clear()
 
-        return False
+        for sprite in group.sprites():
 
-    if pygame.sprite.groupcollide(group_a, group_b, kill_a, kill_b, collide_mask):  # type: ignore
+            self.insert(sprite)
 
-        return True
+    def insert(self, sprite: pygame.sprite.Sprite) -> None:
 
+        for cell in self._cells(sprite.rect):
 
-@jit(nopython=True)
-def get_direction(dx, dy, margin: int = 60) -> Direction:
+            self.cells.setdefault(cell, []).append(sprite)
+
+    def query(self, rect: pygame.Rect) -> list[pygame.sprite.Sprite]:
+        """Returns the sprites sharing at least one cell with a rectangle.
+
+        Args:
+            rect (pygame.Rect): The rectangle to test.
+
+        Returns:
+            list[pygame.sprite.Sprite]: The candidates, without duplicates.
+        """
+
+        candidates: dict = {}
+
+        for cell in self._cells(rect):
+
+            for sprite in self.cells.get(cell, ()):
+
+                candidates[sprite] = None
+
+        return list(candidates)
+
+    def candidate_pairs(self, group: AbstractGroup):
+        """Yields the pairs made of a sprite of a group and a sprite of the grid whose rectangles collide.
+
+        Args:
+            group (AbstractGroup): The sprites to test against the grid.
+        """
+
+        for sprite_a in group.sprites():
+
+            for sprite_b in self.query(sprite_a.rect):
+
+                if sprite_a.rect.colliderect(sprite_b.rect):
+
+                    yield sprite_a, sprite_b
+
+
+def detect_collision(
+        group_a: AbstractGroup,
+        group_b: AbstractGroup,
+        kill_a: bool,
+        kill_b: bool,
+        use_mask: bool = True,
+        spatial_hash: SpatialHash | None = None
+) -> bool:
+    """Detects collisions between two groups, killing the colliding sprites if requested.
+    Candidates are found through a spatial hash of group_b, then tested with their masks. A single sprite
+    tested against a group without a hash is compared with every rectangle instead, cheaper than building one.
+
+    Args:
+        group_a (AbstractGroup): The first group.
+        group_b (AbstractGroup): The second group.
+        kill_a (bool): Whether to kill the sprites of group_a that collide.
+        kill_b (bool): Whether to kill the sprites of group_b that collide.
+        use_mask (bool, optional): Whether to confirm rectangle collisions with a mask test.
+        spatial_hash (SpatialHash | None, optional): A hash of group_b already built for the tick, shared by
+        the calls testing that group, built for this call only if None.
+
+    Returns:
+        bool: True if at least one collision occurred.
+    """
+
+    if spatial_hash is not None:
+        candidate_pairs = spatial_hash.candidate_pairs(group_a)
+    elif len(group_a) == 1:
+        sprite_a: pygame.sprite.Sprite = group_a.sprites()[0]
+        candidate_pairs = (
+            (sprite_a, sprite_b) for sprite_b in group_b.sprites() if sprite_a.rect.colliderect(sprite_b.rect)
+        )
+    else:
+        spatial_hash = SpatialHash()
+        spatial_hash.build(group_b)
+        candidate_pairs = spatial_hash.candidate_pairs(group_a)
+
+    collided_sprites: dict = {}
+
+    for sprite_a, sprite_b in candidate_pairs:
+
+        # A sprite of group_b killed by a previous collision, or since the shared hash was built, can't be hit.
+        if not group_b.has(sprite_b):
+            continue
+
+        if use_mask and not collide_mask(sprite_a, sprite_b):
+            continue
+
+        if not kill_a and not kill_b:
+            return True
+
+        collided_sprites[sprite_a] = None
+
+        if kill_b:
+            sprite_b.kill()
+
+    if kill_a:
+
+        for sprite_a in collided_sprites:
+
+            sprite_a.kill()
+
+    return bool(collided_sprites)
+
+
+def get_direction(dx: int, dy: int, margin: int = 60) -> Direction:
     """Determine the direction of movement based on horizontal and vertical components.
 
     Args:
@@ -99,38 +945,25 @@ def get_direction(dx, dy, margin: int = 60) -> Direction:
         Direction: The direction of movement as an instance of Direction enum.
     """
 
-    # Check if the absolute value of dy is less than the margin.
-    # If dy is within the margin, it indicates horizontal movement.
-    if abs(dy) < margin:
+    # The kernel only deals with integer codes, which are mapped to the enum here, outside of the JIT.
+    return DIRECTIONS[kernels.direction_code(dx, dy, margin)]
 
-        # Check the sign of dx to determine the direction
-        if dx < 0:
-            return Direction.WEST
-        elif dx > 0:
-            return Direction.EAST
 
-    # If dy is not within the margin, check if dx is within the margin.
-    # If dx is within the margin, it indicates vertical movement.
-    elif abs(dx) < margin:
+def get_directions(dx: np.ndarray, dy: np.ndarray, margin: int = 60) -> np.ndarray:
+    """Batched version of get_direction, determining many directions at once.
 
-        # Check the sign of dy to determine the direction.
-        if dy < 0:
-            return Direction.NORTH
-        elif dy > 0:
-            return Direction.SOUTH
+    Args:
+        dx (np.ndarray): The horizontal components of the movements.
+        dy (np.ndarray): The vertical components of the movements.
+        margin (int, optional): The margin of error to consider for horizontal and vertical movements.
 
-    # If neither dx nor dy are within the margin, consider diagonal movement.
-    else:
-        # Check the signs of dx and dy to determine the diagonal direction.
-        if dy < 0:
-            # If dy is negative, the movement is towards the top.
-            return Direction.NORTHWEST if dx < 0 else Direction.NORTHEAST
-        elif dy > 0:
-            # If dy is positive, the movement is towards the bottom.
-            return Direction.SOUTHWEST if dx < 0 else Direction.SOUTHEAST
+    Returns:
+        np.ndarray: The directions of movement as integer codes, see DIRECTIONS.
+    """
 
-    # If none of the above conditions are met.
-    return Direction.NONE
+    return kernels.direction_codes(
+        np.ascontiguousarray(dx, dtype=np.float32), np.ascontiguousarray(dy, dtype=np.float32), margin
+    )
 
 
 def get_shadow_surface(surface: pygame.Surface) -> pygame.Surface:
@@ -143,25 +976,6 @@ def get_shadow_surface(surface: pygame.Surface) -> pygame.Surface:
     return shadow_surface
 
 
-def load_images(folder: Path, alpha: bool = False) -> dict:
-    """Load images from a specified folder.
-
-    Args:
-        folder (Path): The path to the folder containing the images.
-        alpha (bool, optional): Whether to load images with alpha transparency. Defaults to False.
-
-    Returns:
-        dict: A dictionary where keys are the filenames (without extension) of the images
-        and values are the corresponding pygame.Surface objects representing the loaded images.
-    """
-
-    return {
-        image.stem: pygame.image.load(image).convert_alpha() if alpha else pygame.image.load(image).convert()
-        for image in folder.iterdir() if image.is_file()
-    }
-
-
-@jit(nopython=True)
 def calculate_movement(
         destination: tuple[int, int],
         rect_xy: tuple[int, int],
@@ -183,27 +997,47 @@ def calculate_movement(
         the dead zone, returns (0, 0).
     """
 
-    # Calculate the horizontal and vertical differences
-    # between the destination position and the center of the rectangle.
-    dx = destination[0] - rect_xy[0]
-    dy = destination[1] - rect_xy[1]
+    return kernels.movement(destination[0], destination[1], rect_xy[0], rect_xy[1], dead_zone, velocity)
+
+
+class ScreenShake:
+    """
+    Shakes the screen by offsetting the rendered frames for a while, the offset shrinking as the shake fades out.
+    Time is given by the caller, so that the shake follows the simulated time.
+    """
+
+    def __init__(self, amplitude: int = 5, duration: int = 400):
+
+        self.amplitude: int = amplitude
+        self.duration: int = duration
+        self.start_time: int | None = None
+
+    def start(self, now: int) -> None:
+
+        self.start_time = now
+
+    def get_offset(self, now: int) -> tuple[int, int]:
+        """Returns the offset to draw the current frame at.
+
+        Args:
+            now (int): The current time in milliseconds.
+
+        Returns:
+            tuple[int, int]: A random offset within the current amplitude of the shake, (0, 0) when not shaking.
+        """
+
+        if self.start_time is None:
+            return 0, 0
 
-    # Calculate the distance between the destination and
-    # the center of the rectangle using the Pythagorean theorem.
-    distance: float = sqrt((dx ** 2) + (dy ** 2))
+        elapsed: int = now - self.start_time
 
-    # Check if the distance is greater than the dead zone threshold.
-    if distance > dead_zone:
-        return dx / distance * velocity, dy / distance * velocity
-    return 0, 0
+        if elapsed >= self.duration:
+            self.start_time = None
+            return 0, 0
 
+        amplitude: int = round(self.amplitude * (1 - elapsed / self.duration))
 
-def shake_screen(surface: pygame.Surface):
+        return randint(a=-amplitude, b=amplitude), randint(a=-amplitude, b=amplitude)
 
-    for _ in range(20):
 
-        mov_x = randint(a=-5, b=5)
-        mov_y = randint(a=-5, b=5)
-        surface.scroll(mov_x, mov_y)
-        pygame.display.flip()
-        pygame.time.wait(20)
+screen_shake = ScreenShake()
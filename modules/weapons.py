@@ -5,15 +5,22 @@ This module contains functionality related to weapons.
 import pygame
 from math import atan2, cos, sin
 from pathlib import Path
-from random import randint
 
 from modules import constants
-from modules.toolkit import Direction
+from modules.quality import quality_governor
+from modules.simulation import simulation
+from modules.toolkit import Direction, LightMap, ObjectPool, asset_registry, release
 
 
 bullet_sprites = pygame.sprite.Group()
-bullet_image: pygame.Surface = pygame.image.load(Path(constants.GRAPHICS_DIR / "weapons" / "fireball.png"))
-bullet_image.set_colorkey((0, 0, 0))
+
+
+def get_bullet_image() -> pygame.Surface:
+
+    bullet_image: pygame.Surface = asset_registry.get_image(Path(constants.GRAPHICS_DIR / "weapons" / "fireball.png"))
+    bullet_image.set_colorkey((0, 0, 0))
+
+    return bullet_image
 
 
 class Bullet(pygame.sprite.Sprite):
@@ -21,21 +28,35 @@ class Bullet(pygame.sprite.Sprite):
     Represents a bullet fired by the player.
     """
 
-    def __init__(self, player_position: tuple[int, int], player_direction: Direction):
+    def __init__(self, player_position: tuple[int, int], player_direction: Direction, target_position: tuple[int, int]):
         super().__init__()
 
-        self.game_surface: pygame.Surface = pygame.display.get_surface()
-        self.light_surface: pygame.Surface = pygame.Surface((900, 450), pygame.SRCALPHA)
-
-        ##############################
-
-        self.initial_mouse_position: tuple[int, int] = pygame.mouse.get_pos()
-        self.spawn_position: tuple[int, int] = self.set_spawn_position(player_position, player_direction)
         self.speed: int = 20
+        self.image = get_bullet_image()
+        self.mask = asset_registry.get_mask(self.image)
+        self.pooled: bool = False
+        self.reset(
+            player_position=player_position,
+            player_direction=player_direction,
+            target_position=target_position
+        )
 
-        ##############################
+    def reset(
+            self,
+            player_position: tuple[int, int],
+            player_direction: Direction,
+            target_position: tuple[int, int]
+    ) -> None:
+        """Fires the bullet again from the player's position, so that it can be recycled by an object pool.
+
+        Args:
+            player_position (tuple[int, int]): The position of the player.
+            player_direction (Direction): The direction the player is facing.
+            target_position (tuple[int, int]): The position the bullet is fired towards, the mouse position.
+        """
 
-        self.image = bullet_image
+        self.initial_mouse_position: tuple[int, int] = target_position
+        self.spawn_position: tuple[int, int] = self.set_spawn_position(player_position, player_direction)
         self.rect = pygame.rect.Rect(*self.spawn_position, 5, 5)
 
         ##############################
@@ -64,22 +85,24 @@ class Bullet(pygame.sprite.Sprite):
 
         return atan2(distance_y, distance_x)
 
-    def render_light_effect(self) -> None:
-        """Renders a light effect around the bullet's position on a separate surface.
+    def kill(self) -> None:
+
+        super().kill()
+        release(self)
+
+    def render_light_effect(self, light_map: LightMap, position: tuple[int, int] | None = None) -> None:
+        """Renders a light effect around the bullet's position on the shared light map.
 
-        This method fills the light surface with a transparent color and draws
-        a semi-transparent circle representing the light effect around the
-        bullet's current position.
+        This method stamps a semi-transparent glow of random radius representing
+        the light effect around the bullet's current position, smaller at lower quality tiers.
+
+        Args:
+            light_map (LightMap): The light layer composited by the game.
+            position (tuple[int, int] | None, optional): The center of the light, the center of the bullet by default.
         """
 
-        self.light_surface.fill((0, 0, 0, 0))
-        pygame.draw.circle(
-            surface=self.light_surface,
-            color=(255, 153, 0, 5),
-            center=self.rect.center,
-            radius=randint(a=70, b=120),
-            width=0
-        )
+        radius: int = int(simulation.render_random.randint(a=70, b=120) * quality_governor.tier.glow_radius_scale)
+        light_map.add_light(position=position or self.rect.center, radius=radius)
 
     @staticmethod
     def set_spawn_position(player_position: tuple[int, int], player_direction: Direction) -> tuple[int, int]:
@@ -110,5 +133,6 @@ class Bullet(pygame.sprite.Sprite):
     def update(self) -> None:
 
         self.update_position()
-        self.render_light_effect()
-        self.game_surface.blit(self.light_surface, (0, 0))
+
+
+bullet_pool = ObjectPool(Bullet, cap=256)
@@ -0,0 +1,119 @@
+"""
+Bakes every prepared frame of the game into a sprite atlas: the images of the graphics directory
+along with the frames sliced, scaled, flipped and rotated from them at runtime.
+
+    python tools/pack_atlas.py
+
+The frames are gathered by loading the game headless and creating one of each entity,
+so the atlas holds exactly what the game would otherwise prepare on its own.
+"""
+
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pygame  # noqa: E402
+
+from game import Game  # noqa: E402
+from modules import atlas, constants  # noqa: E402
+from modules.player import shoe_print_pool  # noqa: E402
+from modules.spiders import rotated_frames, splash_pool, splat_pool  # noqa: E402
+from modules.toolkit import Direction, asset_registry  # noqa: E402
+
+
+def prepare_frames() -> None:
+    """Creates one of each entity, so that every frame they use is prepared by the asset registry."""
+
+    # The frames are prepared from the original images, even if an atlas was already baked.
+    Game(headless=True, use_atlas=False)
+
+    for pool, arguments in (
+        (splash_pool, {"position": (0, 0)}),
+        (splat_pool, {"position": (0, 0)}),
+        (shoe_print_pool, {"position": (0, 0), "player_direction": Direction.NORTH})
+    ):
+        pool.release(pool.acquire(**arguments))
+
+
+def collect_frames() -> list[tuple[dict, pygame.Surface]]:
+    """Gathers the frames prepared by the asset registry and the rotated frames of the spiders.
+
+    Returns:
+        list[tuple[dict, pygame.Surface]]: The index entry and the image of each frame,
+        the sources of derived frames being listed first.
+    """
+
+    frames: list[tuple[dict, pygame.Surface]] = []
+    frame_ids: dict = {}
+
+    def add(entry: dict, image: pygame.Surface) -> None:
+
+        frames.append((entry, image))
+        frame_ids[image] = entry["id"]
+
+    # Only images loaded with alpha transparency are packed, the others being opaque or color keyed.
+    for (path, alpha), image in asset_registry.images.items():
+
+        if alpha and Path(path).is_relative_to(constants.GRAPHICS_DIR):
+            file: str = Path(path).relative_to(constants.GRAPHICS_DIR).as_posix()
+            add({"id": f"image:{file}", "kind": "image", "file": file}, image)
+
+    for (sheet, size, number, scale, flip), sprites in asset_registry.sprites.items():
+
+        if sheet not in frame_ids:
+            continue
+
+        for index, frame in enumerate(sprites):
+
+            frame_id: str = f"{frame_ids[sheet]}[{size}x{number}*{scale}{',flip' if flip else ''}]#{index}"
+            add(
+                {
+                    "id": frame_id, "kind": "sprites", "sheet": frame_ids[sheet],
+                    "size": size, "number": number, "scale": scale, "flip": flip, "index": index
+                },
+                frame
+            )
+
+    for (source, size), scaled in asset_registry.scaled_surfaces.items():
+
+        if source not in frame_ids:
+            continue
+
+        size = size if size == "scale2x" else list(size)
+        suffix: str = "2x" if size == "scale2x" else f"{size[0]}x{size[1]}"
+        add(
+            {"id": f"{frame_ids[source]}@{suffix}", "kind": "scaled", "source": frame_ids[source], "size": size},
+            scaled
+        )
+
+    for (species, animation, frame_index, direction), (image, _, _) in rotated_frames.items():
+
+        frame_id = f"rotated:{species}/{animation}/{frame_index}/{direction.name}"
+        add({"id": frame_id, "kind": "rotated"}, image)
+
+    return frames
+
+
+def main() -> int:
+
+    parser = ArgumentParser(description="Bakes the frames of Spider Smash into a sprite atlas.")
+    parser.add_argument("--output", type=Path, default=atlas.ATLAS_INDEX, help="where to write the atlas index")
+    parser.add_argument("--width", type=int, default=2048, help="width of the atlas in pixels")
+    arguments = parser.parse_args()
+
+    prepare_frames()
+    frames: list[tuple[dict, pygame.Surface]] = collect_frames()
+    atlas_surface, entries = atlas.pack(frames, width=arguments.width)
+    atlas.save(atlas_surface, entries, index_file=arguments.output)
+
+    width, height = atlas_surface.get_size()
+    print(f"Packed {len(entries)} frames into a {width}x{height} atlas at {arguments.output}")
+
+    return 0
+
+
+if __name__ == '__main__':
+
+    sys.exit(main())